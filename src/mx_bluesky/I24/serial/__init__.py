@@ -1,28 +1,65 @@
-from .extruder.i24ssx_Extruder_Collect_py3v2 import (
-    enter_hutch,
-    initialise_extruder,
-    laser_check,
-    run_extruder_plan,
-)
-from .fixed_target.i24ssx_Chip_Collect_py3v1 import run_fixed_target_plan
-from .fixed_target.i24ssx_Chip_Manager_py3v1 import (
-    block_check,
-    cs_maker,
-    cs_reset,
-    define_current_chip,
-    fiducial,
-    initialise_stages,
-    laser_control,
-    load_lite_map,
-    load_stock_map,
-    moveto,
-    moveto_preset,
-    pumpprobe_calc,
-    save_screen_map,
-    upload_parameters,
-    write_parameter_file,
-)
-from .setup_beamline.setup_detector import setup_detector_stage
+from __future__ import annotations
+
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .extruder.i24ssx_Extruder_Collect_py3v2 import (
+        enter_hutch,
+        initialise_extruder,
+        laser_check,
+        run_extruder_plan,
+    )
+    from .fixed_target.i24ssx_Chip_Collect_py3v1 import run_fixed_target_plan
+    from .fixed_target.i24ssx_Chip_Manager_py3v1 import (
+        block_check,
+        cs_maker,
+        cs_reset,
+        define_current_chip,
+        fiducial,
+        initialise_stages,
+        laser_control,
+        load_lite_map,
+        load_stock_map,
+        moveto,
+        moveto_preset,
+        pumpprobe_calc,
+        save_screen_map,
+        upload_parameters,
+        write_parameter_file,
+    )
+    from .setup_beamline.setup_detector import setup_detector_stage
+
+# Plans are only imported from their submodules on first access, so that importing
+# this package does not pull in all the hardware control modules.
+_EXPORTS = {
+    ".extruder.i24ssx_Extruder_Collect_py3v2": (
+        "enter_hutch",
+        "initialise_extruder",
+        "laser_check",
+        "run_extruder_plan",
+    ),
+    ".fixed_target.i24ssx_Chip_Collect_py3v1": ("run_fixed_target_plan",),
+    ".fixed_target.i24ssx_Chip_Manager_py3v1": (
+        "block_check",
+        "cs_maker",
+        "cs_reset",
+        "define_current_chip",
+        "fiducial",
+        "initialise_stages",
+        "laser_control",
+        "load_lite_map",
+        "load_stock_map",
+        "moveto",
+        "moveto_preset",
+        "pumpprobe_calc",
+        "save_screen_map",
+        "upload_parameters",
+        "write_parameter_file",
+    ),
+    ".setup_beamline.setup_detector": ("setup_detector_stage",),
+}
+_LAZY = {name: module for module, names in _EXPORTS.items() for name in names}
 
 __all__ = [
     "setup_detector_stage",
@@ -47,3 +84,20 @@ __all__ = [
     "upload_parameters",
     "write_parameter_file",
 ]
+_ALL_SET = frozenset(__all__)
+
+
+def __getattr__(name: str):
+    if name not in _ALL_SET:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    # Re-export everything the submodule provides in one go, so it is only looked
+    # up once however many of its plans are used.
+    module_name = _LAZY[name]
+    module = importlib.import_module(module_name, __name__)
+    for export in _EXPORTS[module_name]:
+        globals()[export] = getattr(module, export)
+    return globals()[name]
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY))
@@ -6,7 +6,6 @@ This version in python3 new Feb2021 by RLO
 
 import json
 import logging
-import re
 import shutil
 import sys
 import time
@@ -31,6 +30,7 @@ from mx_bluesky.I24.serial.setup_beamline.setup_zebra_plans import (
     GATE_START,
     TTL_EIGER,
     TTL_PILATUS,
+    ShutterMode,
     arm_zebra,
     open_fast_shutter,
     reset_zebra_when_collection_done_plan,
@@ -110,11 +110,11 @@ def laser_check(mode: str, zebra: Zebra = inject("zebra")) -> MsgGenerator:
     LASER_TTL = TTL_EIGER if isinstance(det_type, Pilatus) else TTL_PILATUS
     if mode == "laseron":
         yield from bps.abs_set(zebra.output.out_pvs[LASER_TTL], SOFT_IN3)
-        yield from set_shutter_mode(zebra, "auto")
+        yield from set_shutter_mode(zebra, ShutterMode.AUTO)
 
     if mode == "laseroff":
         yield from bps.abs_set(zebra.output.out_pvs[LASER_TTL], DISCONNECT)
-        yield from set_shutter_mode(zebra, "manual")
+        yield from set_shutter_mode(zebra, ShutterMode.MANUAL)
 
 
 @log.log_on_entry
@@ -138,8 +138,7 @@ def write_parameter_file(param_path: Path | str = PARAM_FILE_PATH):
     # If file name ends in a digit this causes processing/pilatus pain.
     # Append an underscore
     if det_type.name == "pilatus":
-        m = re.search(r"\d+$", filename)
-        if m is not None:
+        if filename[-1:].isdecimal():
             # Note for future reference. Appending underscore causes more hassle and
             # high probability of users accidentally overwriting data. Use a dash
             filename = filename + "-"
@@ -368,7 +367,7 @@ def run_extruder_plan(zebra: Zebra = inject("zebra")) -> MsgGenerator:
                     caput(pv.eiger_acquire, 0)
                 sleep(1.0)
                 break
-            elif not zebra.pc.is_armed():
+            elif not (yield from bps.rd(zebra.pc.arm.armed)):
                 # As soon as zebra is disarmed, exit.
                 # Epics updates this PV once the collection is done.
                 logger.info("Zebra disarmed - Collection done.")
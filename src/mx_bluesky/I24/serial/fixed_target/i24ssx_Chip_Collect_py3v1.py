@@ -303,7 +303,7 @@ def datasetsizei24(n_exposures: int, chip_type: ChipType, map_type: MappingType)
         chip_format = get_format(chip_type)[2:4]
         block_count = 0
         with open(LITEMAP_PATH / "currentchip.map", "r") as f:
-            for line in f.readlines():
+            for line in f:
                 entry = line.split()
                 if entry[2] == "1":
                     block_count += 1
@@ -10,6 +10,8 @@ import re
 import shutil
 import sys
 import time
+from functools import lru_cache
+from itertools import islice
 from pathlib import Path
 from pprint import pformat
 from time import sleep
@@ -35,11 +37,50 @@ from mx_bluesky.I24.serial.parameters.constants import (
     PARAM_FILE_PATH_FT,
     PVAR_FILE_PATH,
 )
-from mx_bluesky.I24.serial.setup_beamline import Pilatus, caget, caput, pv
+from mx_bluesky.I24.serial.setup_beamline import (
+    Pilatus,
+    caget,
+    caget_many,
+    caput,
+    caput_many,
+    pv,
+)
 from mx_bluesky.I24.serial.setup_beamline.setup_detector import get_detector_type
 
 logger = logging.getLogger("I24ssx.chip_manager")
 
+# Position of the fiducials on the chip, in units of chip size along (x, y)
+FIDUCIAL_POSITIONS = {
+    Fiducials.origin.value: (0.0, 0.0),
+    Fiducials.fid1.value: (1.0, 0.0),
+    Fiducials.fid2.value: (0.0, 1.0),
+}
+
+# Size of the chip along (x, y) used to work out the rotation from the fiducials,
+# for each chip type
+CHIP_FIDUCIAL_SIZES = {
+    ChipType.Oxford: (25.400, 25.400),
+    ChipType.OxfordInner: (24.600, 24.600),
+    ChipType.Custom: (25.400, 25.400),
+    ChipType.Minichip: (18.25, 18.25),
+}
+
+# Block start lines in the pvar files, eg. "P3012=0.000 P3013=3.175"
+PVAR_BLOCK_START_REGEX = re.compile(r"^P3(\d{2})\d*=(\S+) \S+=(\S+)$")
+
+# Motor direction lines in motor_direction.txt, eg. "mtr2_dir=-1"
+MTR_DIRECTION_REGEX = re.compile(r"^mtr([123])\w*\s*=\s*(\S+)", re.MULTILINE)
+
+# Block start list for block_check, other chips use the Oxford chip one
+BLOCK_CHECK_PVAR_FILES = {
+    ChipType.Minichip: "minichip-oxford.pvar",
+}
+
+# Chip type value (GP1) and number of blocks per side for each chipid.
+CHIPID_SETTINGS = {
+    "oxford": (ChipType.Oxford.value, 8),
+}
+
 
 def _coerce_to_path(path: Path | str) -> Path:
     if not isinstance(path, Path):
@@ -47,6 +88,104 @@ def _coerce_to_path(path: Path | str) -> Path:
     return path
 
 
+def _create_oxford_block_dict() -> dict[str, str]:
+    """Map the lite map button names to the block numbers in snake order."""
+    rows = ["A", "B", "C", "D", "E", "F", "G", "H"]
+    columns = list(range(1, 10))
+    btn_names = {}
+    flip = True
+    for x, column in enumerate(columns):
+        for y, row in enumerate(rows):
+            i = x * 8 + y
+            if i % 8 == 0 and flip is False:
+                flip = True
+                z = 8 - (y + 1)
+            elif i % 8 == 0 and flip is True:
+                flip = False
+                z = y
+            elif flip is False:
+                z = y
+            elif flip is True:
+                z = 8 - (y + 1)
+            else:
+                logger.warning("Problem in Chip Grid Creation")
+                break
+            button_name = str(row) + str(column)
+            lab_num = x * 8 + z
+            label = "%02.d" % (lab_num + 1)
+            btn_names[button_name] = label
+    return btn_names
+
+
+OXFORD_BLOCK_DICT = _create_oxford_block_dict()
+
+# fmt: off
+# Oxford_block_dict is wrong (columns and rows need to flip) the one above is generated automatically however kept this for backwards compatiability/reference
+_LEGACY_OXFORD_BLOCK_DICT = {
+    'A1': '01', 'A2': '02', 'A3': '03', 'A4': '04', 'A5': '05', 'A6': '06', 'A7': '07', 'A8': '08',
+    'B1': '16', 'B2': '15', 'B3': '14', 'B4': '13', 'B5': '12', 'B6': '11', 'B7': '10', 'B8': '09',
+    'C1': '17', 'C2': '18', 'C3': '19', 'C4': '20', 'C5': '21', 'C6': '22', 'C7': '23', 'C8': '24',
+    'D1': '32', 'D2': '31', 'D3': '30', 'D4': '29', 'D5': '28', 'D6': '27', 'D7': '26', 'D8': '25',
+    'E1': '33', 'E2': '34', 'E3': '35', 'E4': '36', 'E5': '37', 'E6': '38', 'E7': '39', 'E8': '40',
+    'F1': '48', 'F2': '47', 'F3': '46', 'F4': '45', 'F5': '44', 'F6': '43', 'F7': '42', 'F8': '41',
+    'G1': '49', 'G2': '50', 'G3': '51', 'G4': '52', 'G5': '53', 'G6': '54', 'G7': '55', 'G8': '56',
+    'H1': '64', 'H2': '63', 'H3': '62', 'H4': '61', 'H5': '60', 'H6': '59', 'H7': '58', 'H8': '57',
+}
+# fmt: on
+
+# fmt: off
+# Blocks to switch on for each of the stock maps in the lite map edm screen
+_R33 = (19, 18, 17, 26, 31, 32, 33, 24, 25)
+_R55 = (9, 10, 11, 12, 13, 16, 27, 30, 41, 40, 39, 38, 37, 34, 23, 20) + _R33
+_R77 = (
+    7, 6, 5, 4, 3, 2, 1, 14, 15, 28, 29, 42, 43, 44, 45, 46, 47, 48, 49, 36, 35, 22,
+    21, 8,
+) + _R55
+_H33 = (3, 2, 1, 6, 7, 8, 9, 4, 5)
+_X33 = (31, 32, 33, 40, 51, 50, 49, 42, 41)
+_X55 = (25, 24, 23, 22, 21, 34, 39, 52, 57, 58, 59, 60, 61, 48, 43, 30) + _X33
+_X77 = (
+    11, 12, 13, 14, 15, 16, 17, 20, 35, 38, 53, 56, 71, 70, 69, 68, 67, 66, 65, 62, 47,
+    44, 29, 26,
+) + _X55
+_X99 = (
+    9, 8, 7, 6, 5, 4, 3, 2, 1, 18, 19, 36, 37, 54, 55, 72, 73, 74, 75, 76, 77, 78,
+    79, 80, 81, 64, 63, 46, 45, 28, 27, 10,
+) + _X77
+_X44 = (22, 21, 20, 19, 30, 35, 46, 45, 44, 43, 38, 27, 28, 29, 36, 37)
+_X49 = tuple(range(1, 50))
+_X66 = (
+    10, 11, 12, 13, 14, 15, 18, 31, 34, 47, 50, 51, 52, 53, 54, 55, 42, 39, 26, 23
+) + _X44
+_X88 = (
+    8, 7, 6, 5, 4, 3, 2, 1, 16, 17, 32, 33, 48, 49, 64, 63, 62, 61, 60, 59, 58, 57, 56,
+    41, 40, 25, 24, 9,
+) + _X66
+# Columns for doing half chips
+_HALF1 = tuple(range(1, 33))
+_HALF2 = tuple(range(33, 65))
+
+STOCK_MAP_BLOCKS = {
+    "Just The First Block": (1,),
+    "clear": (),
+    "r33": _R33,
+    "r55": _R55,
+    "r77": _R77,
+    "h33": _H33,
+    "x33": _X33,
+    "x44": _X44,
+    "x49": _X49,
+    "x55": _X55,
+    "x66": _X66,
+    "x77": _X77,
+    "x88": _X88,
+    "x99": _X99,
+    "half1": _HALF1,
+    "half2": _HALF2,
+}
+# fmt: on
+
+
 def setup_logging():
     # Log should now change name daily.
     logfile = time.strftime("i24fixedtarget_%d%B%y.log").lower()
@@ -106,11 +245,8 @@ def initialise_stages(pmac: PMAC = inject("pmac")) -> MsgGenerator:
 
     sleep(0.1)
     logger.info("Clearing General Purpose PVs 1-120")
-    for i in range(4, 120):
-        pvar = "ME14E-MO-IOC-01:GP" + str(i)
-        caput(pvar, 0)
-        sys.stdout.write(".")
-        sys.stdout.flush()
+    gp_pvs = ["ME14E-MO-IOC-01:GP" + str(i) for i in range(4, 120)]
+    caput_many(gp_pvs, [0] * len(gp_pvs))
 
     caput(pv.me14e_gp100, "press set params to read visit")
     caput(pv.me14e_gp101, det_type.name)
@@ -133,16 +269,44 @@ def write_parameter_file(
         "Writing Parameter File: %s" % (param_path / PARAM_FILE_NAME).as_posix()
     )
 
-    filename = caget(pv.me14e_chip_name)
+    (
+        visit,
+        directory,
+        filename,
+        exposure_time,
+        detector_distance,
+        num_exposures,
+        chip_type,
+        map_type,
+        pump_repeat,
+        checker_pattern,
+        laser_dwell,
+        laser_delay,
+        pre_pump_exposure,
+    ) = caget_many(
+        [
+            pv.me14e_gp100,
+            pv.me14e_filepath,
+            pv.me14e_chip_name,
+            pv.me14e_exptime,
+            pv.me14e_dcdetdist,
+            pv.me14e_gp3,
+            pv.me14e_gp1,
+            pv.me14e_gp2,
+            pv.me14e_gp4,
+            pv.me14e_gp111,
+            pv.me14e_gp103,
+            pv.me14e_gp110,
+            pv.me14e_gp109,
+        ]
+    )
     det_type = get_detector_type()
-    map_type = caget(pv.me14e_gp2)
 
     # If file name ends in a digit this causes processing/pilatus pain.
     # Append an underscore
     if isinstance(det_type, Pilatus):
         caput(pv.pilat_cbftemplate, 0)
-        m = re.search(r"\d+$", filename)
-        if m is not None:
+        if filename[-1:].isdecimal():
             # Note for future reference. Appending underscore causes more hassle and
             # high probability of users accidentally overwriting data. Use a dash
             filename = filename + "-"
@@ -151,27 +315,27 @@ def write_parameter_file(
             )
 
     params_dict = {
-        "visit": caget(pv.me14e_gp100),
-        "directory": caget(pv.me14e_filepath),
+        "visit": visit,
+        "directory": directory,
         "filename": filename,
-        "exposure_time_s": caget(pv.me14e_exptime),
-        "detector_distance_mm": caget(pv.me14e_dcdetdist),
+        "exposure_time_s": exposure_time,
+        "detector_distance_mm": detector_distance,
         "detector_name": str(det_type),
-        "num_exposures": caget(pv.me14e_gp3),
-        "chip_type": caget(pv.me14e_gp1),
+        "num_exposures": num_exposures,
+        "chip_type": chip_type,
         "map_type": map_type,
-        "pump_repeat": caget(pv.me14e_gp4),
-        "checker_pattern": bool(caget(pv.me14e_gp111)),
-        "laser_dwell_s": caget(pv.me14e_gp103),
-        "laser_delay_s": caget(pv.me14e_gp110),
-        "pre_pump_exposure_s": caget(pv.me14e_gp109),
+        "pump_repeat": pump_repeat,
+        "checker_pattern": bool(checker_pattern),
+        "laser_dwell_s": laser_dwell,
+        "laser_delay_s": laser_delay,
+        "pre_pump_exposure_s": pre_pump_exposure,
     }
 
+    # Serialise first, json.dump would write to the file one token at a time
     with open(param_path / PARAM_FILE_NAME, "w") as f:
-        json.dump(params_dict, f, indent=4)
+        f.write(json.dumps(params_dict, indent=4))
 
-    logger.info("Information written to file \n")
-    logger.info(pformat(params_dict))
+    logger.info("Information written to file \n%s" % pformat(params_dict))
 
     if map_type == MappingType.Full:
         # This step creates some header files (.addr, .spec), containing the parameters,
@@ -181,29 +345,23 @@ def write_parameter_file(
     yield from bps.null()
 
 
+@lru_cache(maxsize=4)
+def _read_pvar_block_starts(pvar_file: Path, mtime_ns: int):
+    # The modification time is part of the cache key, so that an edited file
+    # is read again.
+    block_starts = []
+    with open(pvar_file, "r") as f:
+        for line in f:
+            m = PVAR_BLOCK_START_REGEX.match(line.rstrip())
+            if m is not None:
+                block_starts.append(m.groups())
+    return tuple(block_starts)
+
+
 def scrape_pvar_file(fid: str, pvar_dir: Path | str = PVAR_FILE_PATH):
-    block_start_list = []
-    pvar_dir = _coerce_to_path(pvar_dir)
-
-    with open(pvar_dir / fid, "r") as f:
-        lines = f.readlines()
-    for line in lines:
-        line = line.rstrip()
-        if line.startswith("#"):
-            continue
-        elif line.startswith("P3000"):
-            continue
-        elif line.startswith("P3011"):
-            continue
-        elif not len(line.split(" ")) == 2:
-            continue
-        else:
-            entry = line.split(" ")
-            block_num = entry[0][2:4]
-            x = entry[0].split("=")[1]
-            y = entry[1].split("=")[1]
-            block_start_list.append([block_num, x, y])
-    return block_start_list
+    pvar_file = _coerce_to_path(pvar_dir) / fid
+    block_starts = _read_pvar_block_starts(pvar_file, pvar_file.stat().st_mtime_ns)
+    return [list(block_start) for block_start in block_starts]
 
 
 @log.log_on_entry
@@ -226,14 +384,14 @@ def define_current_chip(
         pmac = i24.pmac()
     chip_type = int(caget(pv.me14e_gp1))
     logger.info("Chip type:%s Chipid:%s" % (chip_type, chipid))
-    if chipid == "oxford":
-        caput(pv.me14e_gp1, 1)
+    if chipid in CHIPID_SETTINGS and chip_type != CHIPID_SETTINGS[chipid][0]:
+        caput(pv.me14e_gp1, CHIPID_SETTINGS[chipid][0])
 
     param_path = _coerce_to_path(pvar_path)
 
     with open(param_path / f"{chipid}.pvar", "r") as f:
         logger.info("Opening %s.pvar" % chipid)
-        for line in f.readlines():
+        for line in f:
             if line.startswith("#"):
                 continue
             line_from_file = line.rstrip("\n")
@@ -250,15 +408,17 @@ def save_screen_map(map_path: Optional[str] = None) -> MsgGenerator:
     litemap_path.mkdir(parents=True, exist_ok=True)
 
     logger.info("Saving %s currentchip.map" % litemap_path.as_posix())
+    block_pvs = ["ME14E-MO-IOC-01:GP%i" % (x + 10) for x in range(1, 82)]
+    block_vals = caget_many(block_pvs)
+    lines = []
+    logger.debug("Printing only blocks with block_val == 1")
+    for x, block_str, val in zip(range(1, 82), block_pvs, block_vals):
+        block_val = int(val)
+        if block_val == 1:
+            logger.info("%s %d" % (block_str, block_val))
+        lines.append("%02dstatus    P3%02d1 \t%s\n" % (x, x, block_val))
     with open(litemap_path / "currentchip.map", "w") as f:
-        logger.debug("Printing only blocks with block_val == 1")
-        for x in range(1, 82):
-            block_str = "ME14E-MO-IOC-01:GP%i" % (x + 10)
-            block_val = int(caget(block_str))
-            if block_val == 1:
-                logger.info("%s %d" % (block_str, block_val))
-            line = "%02dstatus    P3%02d1 \t%s\n" % (x, x, block_val)
-            f.write(line)
+        f.write("".join(lines))
     yield from bps.null()
 
 
@@ -273,9 +433,8 @@ def upload_parameters(
 ) -> MsgGenerator:
     setup_logging()
     logger.info("Uploading Parameters to the GeoBrick")
-    if chipid == "oxford":
-        caput(pv.me14e_gp1, 0)
-        width = 8
+    chip_type, width = CHIPID_SETTINGS[chipid]
+    caput(pv.me14e_gp1, chip_type)
     if not map_path:
         map_path = LITEMAP_PATH.as_posix()
     litemap_path = _coerce_to_path(map_path)
@@ -283,24 +442,29 @@ def upload_parameters(
     with open(litemap_path / "currentchip.map", "r") as f:
         logger.info("Chipid %s" % chipid)
         logger.info("width %d" % width)
-        x = 1
-        for line in f.readlines()[: width**2]:
+        lines = list(islice(f, width**2))
+
+    # Go through the block settings one row of the chip at a time
+    for i in range(0, len(lines), width):
+        row_settings = []
+        row_display = []
+        for line in lines[i : i + width]:
             cols = line.split()
             pvar = cols[1]
             value = cols[2]
             s = pvar + "=" + value
             if value != "1":
-                s2 = pvar + "   "
-                sys.stdout.write(s2)
+                row_display.append(pvar + "   ")
             else:
-                sys.stdout.write(s + " ")
-            sys.stdout.flush()
-            if x == width:
-                print()
-                x = 1
-            else:
-                x += 1
-            yield from bps.abs_set(pmac.pmac_string, s, wait=True)
+                row_display.append(s + " ")
+            row_settings.append(s)
+        logger.info("".join(row_display))
+        # Group a few settings per write, keeping each string under the 40
+        # character limit of the PMAC_STRING PV
+        for j in range(0, len(row_settings), 4):
+            yield from bps.abs_set(
+                pmac.pmac_string, " ".join(row_settings[j : j + 4]), wait=True
+            )
             sleep(0.02)
 
     logger.warning("Automatic Setting Mapping Type to Lite has been disabled")
@@ -316,13 +480,11 @@ def upload_full(pmac: PMAC = None, fullmap_path: Path | str = FULLMAP_PATH):
     fullmap_path.mkdir(parents=True, exist_ok=True)
 
     with open(fullmap_path / "currentchip.full", "r") as fh:
-        f = fh.readlines()
+        lines = [line.rstrip("\n") for line in fh]
 
-    for i in range(len(f) // 2):
-        pmac_list = []
-        for j in range(2):
-            pmac_list.append(f.pop(0).rstrip("\n"))
-        writeline = " ".join(pmac_list)
+    # Send the lines two at a time, a trailing odd line is not sent
+    for first, second in zip(lines[0::2], lines[1::2]):
+        writeline = " ".join((first, second))
         logger.info("%s" % writeline)
         yield from bps.abs_set(pmac.pmac_string, writeline, wait=True)
         yield from bps.sleep(0.02)
@@ -335,199 +497,15 @@ def load_stock_map(map_choice: str = "clear") -> MsgGenerator:
     setup_logging()
     logger.info("Adjusting Lite Map EDM Screen")
     logger.debug("Please wait, adjusting lite map")
-    #
-    r33 = [19, 18, 17, 26, 31, 32, 33, 24, 25]
-    r55 = [9, 10, 11, 12, 13, 16, 27, 30, 41, 40, 39, 38, 37, 34, 23, 20] + r33
-    r77 = [
-        7,
-        6,
-        5,
-        4,
-        3,
-        2,
-        1,
-        14,
-        15,
-        28,
-        29,
-        42,
-        43,
-        44,
-        45,
-        46,
-        47,
-        48,
-        49,
-        36,
-        35,
-        22,
-        21,
-        8,
-    ] + r55
-    #
-    h33 = [3, 2, 1, 6, 7, 8, 9, 4, 5]
-    x33 = [31, 32, 33, 40, 51, 50, 49, 42, 41]
-    x55 = [25, 24, 23, 22, 21, 34, 39, 52, 57, 58, 59, 60, 61, 48, 43, 30] + x33
-    x77 = [
-        11,
-        12,
-        13,
-        14,
-        15,
-        16,
-        17,
-        20,
-        35,
-        38,
-        53,
-        56,
-        71,
-        70,
-        69,
-        68,
-        67,
-        66,
-        65,
-        62,
-        47,
-        44,
-        29,
-        26,
-    ] + x55
-    x99 = [
-        9,
-        8,
-        7,
-        6,
-        5,
-        4,
-        3,
-        2,
-        1,
-        18,
-        19,
-        36,
-        37,
-        54,
-        55,
-        72,
-        73,
-        74,
-        75,
-        76,
-        77,
-        78,
-        79,
-        80,
-        81,
-        64,
-        63,
-        46,
-        45,
-        28,
-        27,
-        10,
-    ] + x77
-    x44 = [22, 21, 20, 19, 30, 35, 46, 45, 44, 43, 38, 27, 28, 29, 36, 37]
-    x49 = [x + 1 for x in range(49)]
-    x66 = [
-        10,
-        11,
-        12,
-        13,
-        14,
-        15,
-        18,
-        31,
-        34,
-        47,
-        50,
-        51,
-        52,
-        53,
-        54,
-        55,
-        42,
-        39,
-        26,
-        23,
-    ] + x44
-    x88 = [
-        8,
-        7,
-        6,
-        5,
-        4,
-        3,
-        2,
-        1,
-        16,
-        17,
-        32,
-        33,
-        48,
-        49,
-        64,
-        63,
-        62,
-        61,
-        60,
-        59,
-        58,
-        57,
-        56,
-        41,
-        40,
-        25,
-        24,
-        9,
-    ] + x66
-    #
-    # Columns for doing half chips
-    c1 = [1, 2, 3, 4, 5, 6, 7, 8]
-    c2 = [9, 10, 11, 12, 13, 14, 15, 16]
-    c3 = [17, 18, 19, 20, 21, 22, 23, 24]
-    c4 = [25, 26, 27, 28, 29, 30, 31, 32]
-    c5 = [33, 34, 35, 36, 37, 38, 39, 40]
-    c6 = [41, 42, 43, 44, 45, 46, 47, 48]
-    c7 = [49, 50, 51, 52, 53, 54, 55, 56]
-    c8 = [57, 58, 59, 60, 61, 62, 63, 64]
-    half1 = c1 + c2 + c3 + c4
-    half2 = c5 + c6 + c7 + c8
-
-    map_dict = {}
-    map_dict["Just The First Block"] = [1]
-    map_dict["clear"] = []
-    #
-    map_dict["r33"] = r33
-    map_dict["r55"] = r55
-    map_dict["r77"] = r77
-    #
-    map_dict["h33"] = h33
-    #
-    map_dict["x33"] = x33
-    map_dict["x44"] = x44
-    map_dict["x49"] = x49
-    map_dict["x55"] = x55
-    map_dict["x66"] = x66
-    map_dict["x77"] = x77
-    map_dict["x88"] = x88
-    map_dict["x99"] = x99
-
-    map_dict["half1"] = half1
-    map_dict["half2"] = half2
 
+    # Clear GP 11-74 and load the chosen map in a single batch of caputs
     logger.info("Clearing GP 10-74")
-    for i in range(1, 65):
-        pvar = "ME14E-MO-IOC-01:GP" + str(i + 10)
-        caput(pvar, 0)
-        sys.stdout.write(".")
-        sys.stdout.flush()
-    logger.info("Map cleared")
     logger.info("Loading Map Choice %s" % map_choice)
-    for i in map_dict[map_choice]:
-        pvar = "ME14E-MO-IOC-01:GP" + str(i + 10)
-        caput(pvar, 1)
+    blocks = set(STOCK_MAP_BLOCKS[map_choice])
+    # Some maps (eg. x77, x99) also switch on blocks above 64, which are not cleared
+    block_nums = sorted(set(range(1, 65)) | blocks)
+    block_pvs = ["ME14E-MO-IOC-01:GP" + str(i + 10) for i in block_nums]
+    caput_many(block_pvs, [int(i in blocks) for i in block_nums])
     logger.debug("Load stock map done.")
     yield from bps.null()
 
@@ -537,47 +515,10 @@ def load_lite_map(map_path: Optional[str] = None) -> MsgGenerator:
     setup_logging()
     logger.debug("Run load stock map with 'clear' setting.")
     yield from load_stock_map("clear")
-    # fmt: off
-    # Oxford_block_dict is wrong (columns and rows need to flip) added in script below to generate it automatically however kept this for backwards compatiability/reference
-    oxford_block_dict = {   # noqa: F841
-        'A1': '01', 'A2': '02', 'A3': '03', 'A4': '04', 'A5': '05', 'A6': '06', 'A7': '07', 'A8': '08',
-        'B1': '16', 'B2': '15', 'B3': '14', 'B4': '13', 'B5': '12', 'B6': '11', 'B7': '10', 'B8': '09',
-        'C1': '17', 'C2': '18', 'C3': '19', 'C4': '20', 'C5': '21', 'C6': '22', 'C7': '23', 'C8': '24',
-        'D1': '32', 'D2': '31', 'D3': '30', 'D4': '29', 'D5': '28', 'D6': '27', 'D7': '26', 'D8': '25',
-        'E1': '33', 'E2': '34', 'E3': '35', 'E4': '36', 'E5': '37', 'E6': '38', 'E7': '39', 'E8': '40',
-        'F1': '48', 'F2': '47', 'F3': '46', 'F4': '45', 'F5': '44', 'F6': '43', 'F7': '42', 'F8': '41',
-        'G1': '49', 'G2': '50', 'G3': '51', 'G4': '52', 'G5': '53', 'G6': '54', 'G7': '55', 'G8': '56',
-        'H1': '64', 'H2': '63', 'H3': '62', 'H4': '61', 'H5': '60', 'H6': '59', 'H7': '58', 'H8': '57',
-    }
-    # fmt: on
     chip_type = int(caget(pv.me14e_gp1))
     if chip_type in [ChipType.Oxford, ChipType.OxfordInner]:
         logger.info("Oxford Block Order")
-        rows = ["A", "B", "C", "D", "E", "F", "G", "H"]
-        columns = list(range(1, 10))
-        btn_names = {}
-        flip = True
-        for x, column in enumerate(columns):
-            for y, row in enumerate(rows):
-                i = x * 8 + y
-                if i % 8 == 0 and flip is False:
-                    flip = True
-                    z = 8 - (y + 1)
-                elif i % 8 == 0 and flip is True:
-                    flip = False
-                    z = y
-                elif flip is False:
-                    z = y
-                elif flip is True:
-                    z = 8 - (y + 1)
-                else:
-                    logger.warning("Problem in Chip Grid Creation")
-                    break
-                button_name = str(row) + str(column)
-                lab_num = x * 8 + z
-                label = "%02.d" % (lab_num + 1)
-                btn_names[button_name] = label
-        block_dict = btn_names
+        block_dict = OXFORD_BLOCK_DICT
 
     if not map_path:
         map_path = LITEMAP_PATH.as_posix()
@@ -588,14 +529,22 @@ def load_lite_map(map_path: Optional[str] = None) -> MsgGenerator:
     logger.debug("Loading Lite Map")
     logger.info("Opening %s" % (litemap_path / litemap_fid))
     with open(litemap_path / litemap_fid, "r") as fh:
-        f = fh.readlines()
-    for line in f:
-        entry = line.split()
+        entries = [line.split() for line in fh if line.strip()]
+    block_pvs = []
+    block_vals = []
+    block_info = []
+    for entry in entries:
         block_name = entry[0]
         yesno = entry[1]
         block_num = block_dict[block_name]
         pvar = "ME14E-MO-IOC-01:GP" + str(int(block_num) + 10)
-        logger.info("Block: %s \tScanned: %s \tPVAR: %s" % (block_name, yesno, pvar))
+        block_pvs.append(pvar)
+        block_vals.append(yesno)
+        block_info.append(
+            "Block: %s \tScanned: %s \tPVAR: %s" % (block_name, yesno, pvar)
+        )
+    logger.info("\n".join(block_info))
+    caput_many(block_pvs, block_vals)
     logger.debug("Load lite map done")
     yield from bps.null()
 
@@ -610,7 +559,7 @@ def load_full_map(fullmap_path: Path | str = FULLMAP_PATH):
     logger.info("Opening %s" % fullmap_fid)
     mapping.plot_file(fullmap_fid, params.chip_type.value)
     mapping.convert_chip_to_hex(fullmap_fid, params.chip_type.value)
-    shutil.copy2(fullmap_fid.with_suffix(".full"), fullmap_path / "currentchip.full")
+    shutil.copyfile(fullmap_fid.with_suffix(".full"), fullmap_path / "currentchip.full")
     logger.info(
         "Copying %s to %s"
         % (fullmap_fid.with_suffix(".full"), fullmap_path / "currentchip.full")
@@ -637,12 +586,11 @@ def moveto(place: str = "origin", pmac: PMAC = inject("pmac")) -> MsgGenerator:
     logger.info(f"{str(ChipType(chip_type))} Move")
     chip_move = ChipType(chip_type).get_approx_chip_size()
 
-    if place == Fiducials.origin:
-        yield from bps.mv(pmac.x, 0.0, pmac.y, 0.0)
-    if place == Fiducials.fid1:
-        yield from bps.mv(pmac.x, chip_move, pmac.y, 0.0)
-    if place == Fiducials.fid2:
-        yield from bps.mv(pmac.x, 0.0, pmac.y, chip_move)
+    if place not in FIDUCIAL_POSITIONS:
+        logger.warning(f"Unknown place {place} to move to")
+        return
+    x_size, y_size = FIDUCIAL_POSITIONS[place]
+    yield from bps.mv(pmac.x, x_size * chip_move, pmac.y, y_size * chip_move)
 
 
 @log.log_on_entry
@@ -656,16 +604,13 @@ def moveto_preset(place: str, pmac: PMAC = inject("pmac")) -> MsgGenerator:
 
     elif place == "load_position":
         logger.info("load position")
-        caput(pv.bs_mp_select, "Robot")
-        caput(pv.bl_mp_select, "Out")
-        caput(pv.det_z, 1300)
+        caput_many([pv.bs_mp_select, pv.bl_mp_select, pv.det_z], ["Robot", "Out", 1300])
 
     elif place == "collect_position":
         logger.info("collect position")
         caput(pv.me14e_filter, 20)
         yield from bps.mv(pmac.x, 0.0, pmac.y, 0.0, pmac.z, 0.0)
-        caput(pv.bs_mp_select, "Data Collection")
-        caput(pv.bl_mp_select, "In")
+        caput_many([pv.bs_mp_select, pv.bl_mp_select], ["Data Collection", "In"])
 
     elif place == "microdrop_position":
         logger.info("microdrop align position")
@@ -696,7 +641,7 @@ def laser_control(laser_setting: str, pmac: PMAC = inject("pmac")) -> MsgGenerat
         yield from bps.abs_set(pmac.laser, LaserSettings.LASER_2_OFF, wait=True)
 
     elif laser_setting == "laser1burn":
-        led_burn_time = caget(pv.me14e_gp103)
+        led_burn_time = float(caget(pv.me14e_gp103))
         logger.info("Laser 1  on")
         logger.info("Burn time is %s s" % led_burn_time)
         yield from bps.abs_set(pmac.laser, LaserSettings.LASER_1_ON, wait=True)
@@ -705,7 +650,7 @@ def laser_control(laser_setting: str, pmac: PMAC = inject("pmac")) -> MsgGenerat
         yield from bps.abs_set(pmac.laser, LaserSettings.LASER_1_OFF, wait=True)
 
     elif laser_setting == "laser2burn":
-        led_burn_time = caget(pv.me14e_gp109)
+        led_burn_time = float(caget(pv.me14e_gp109))
         logger.info("Laser 2 on")
         logger.info("burntime %s s" % led_burn_time)
         yield from bps.abs_set(pmac.laser, LaserSettings.LASER_2_ON, wait=True)
@@ -714,22 +659,24 @@ def laser_control(laser_setting: str, pmac: PMAC = inject("pmac")) -> MsgGenerat
         yield from bps.abs_set(pmac.laser, LaserSettings.LASER_2_OFF, wait=True)
 
 
+@lru_cache(maxsize=8)
+def _read_mtr_directions(motor_file: Path, mtime_ns: int):
+    # The modification time is part of the cache key, so that an edited file
+    # is read again.
+    with open(motor_file, "r") as f:
+        directions = {
+            int(mtr): float(direction)
+            for mtr, direction in MTR_DIRECTION_REGEX.findall(f.read())
+        }
+    return directions.get(1, 1.0), directions.get(2, 1.0), directions.get(3, 1.0)
+
+
 @log.log_on_entry
 def scrape_mtr_directions(motor_file_path: Path | str = CS_FILES_PATH):
-    motor_file_path = _coerce_to_path(motor_file_path)
-
-    with open(motor_file_path / "motor_direction.txt", "r") as f:
-        lines = f.readlines()
-    mtr1_dir, mtr2_dir, mtr3_dir = 1.0, 1.0, 1.0
-    for line in lines:
-        if line.startswith("mtr1"):
-            mtr1_dir = float(line.split("=")[1])
-        elif line.startswith("mtr2"):
-            mtr2_dir = float(line.split("=")[1])
-        elif line.startswith("mtr3"):
-            mtr3_dir = float(line.split("=")[1])
-        else:
-            continue
+    motor_file = _coerce_to_path(motor_file_path) / "motor_direction.txt"
+    mtr1_dir, mtr2_dir, mtr3_dir = _read_mtr_directions(
+        motor_file, motor_file.stat().st_mtime_ns
+    )
     logger.debug("mt1_dir %s mtr2_dir %s mtr3_dir %s" % (mtr1_dir, mtr2_dir, mtr3_dir))
     return mtr1_dir, mtr2_dir, mtr3_dir
 
@@ -748,16 +695,15 @@ def fiducial(point: int = 1, pmac: PMAC = inject("pmac")) -> MsgGenerator:
     output_param_path = PARAM_FILE_PATH_FT
     output_param_path.mkdir(parents=True, exist_ok=True)
     logger.info("Writing Fiducial File %s/fiducial_%s.txt" % (output_param_path, point))
-    logger.info("MTR\tRBV\tRAW\tCorr\tf_value")
-    logger.info("MTR1\t%1.4f\t%i" % (rbv_1, mtr1_dir))
-    logger.info("MTR2\t%1.4f\t%i" % (rbv_2, mtr2_dir))
-    logger.info("MTR3\t%1.4f\t%i" % (rbv_3, mtr3_dir))
+    lines = [
+        "MTR1\t%1.4f\t%i" % (rbv_1, mtr1_dir),
+        "MTR2\t%1.4f\t%i" % (rbv_2, mtr2_dir),
+        "MTR3\t%1.4f\t%i" % (rbv_3, mtr3_dir),
+    ]
+    logger.info("\n".join(["MTR\tRBV\tRAW\tCorr\tf_value"] + lines))
 
     with open(output_param_path / f"fiducial_{point}.txt", "w") as f:
-        f.write("MTR\tRBV\tCorr\n")
-        f.write("MTR1\t%1.4f\t%i\n" % (rbv_1, mtr1_dir))
-        f.write("MTR2\t%1.4f\t%i\n" % (rbv_2, mtr2_dir))
-        f.write("MTR3\t%1.4f\t%i" % (rbv_3, mtr3_dir))
+        f.write("\n".join(["MTR\tRBV\tCorr"] + lines))
     logger.info(f"Fiducial {point} set.")
     yield from bps.null()
 
@@ -806,12 +752,10 @@ def cs_maker(pmac: PMAC = inject("pmac")) -> MsgGenerator:
     """
     setup_logging()
     chip_type = int(caget(pv.me14e_gp1))
-    fiducial_dict = {}
-    fiducial_dict[0] = [25.400, 25.400]
-    fiducial_dict[1] = [24.600, 24.600]
-    fiducial_dict[2] = [25.400, 25.400]
-    fiducial_dict[3] = [18.25, 18.25]
-    logger.info("Chip type is %s with size %s" % (chip_type, fiducial_dict[chip_type]))
+    fid_size_x, fid_size_y = CHIP_FIDUCIAL_SIZES[chip_type]
+    logger.info(
+        "Chip type is %s with size %s" % (chip_type, CHIP_FIDUCIAL_SIZES[chip_type])
+    )
 
     mtr1_dir, mtr2_dir, mtr3_dir = scrape_mtr_directions()
     f1_x, f1_y, f1_z = scrape_mtr_fiducials(1)
@@ -854,42 +798,38 @@ def cs_maker(pmac: PMAC = inject("pmac")) -> MsgGenerator:
 
     # Rotation Around Z
     # If stages upsidedown (I24) change sign of Sz
-    Sz1 = -1 * f1_y / fiducial_dict[chip_type][0]
-    Sz2 = f2_x / fiducial_dict[chip_type][1]
+    Sz1 = -1 * f1_y / fid_size_x
+    Sz2 = f2_x / fid_size_y
     Sz = Sz_dir * ((Sz1 + Sz2) / 2)
     Cz = np.sqrt((1 - Sz**2))
-    logger.info("Sz1 , %1.4f, %1.4f" % (Sz1, np.degrees(np.arcsin(Sz1))))
-    logger.info("Sz2 , %1.4f, %1.4f" % (Sz2, np.degrees(np.arcsin(Sz2))))
-    logger.info("Sz , %1.4f, %1.4f" % (Sz, np.degrees(np.arcsin(Sz))))
-    logger.info("Cz , %1.4f, %1.4f" % (Cz, np.degrees(np.arcsin(Cz))))
     # Rotation Around Y
-    Sy = Sy_dir * f1_z / fiducial_dict[chip_type][0]
+    Sy = Sy_dir * f1_z / fid_size_x
     Cy = np.sqrt((1 - Sy**2))
-    logger.info("Sy , %1.4f, %1.4f" % (Sy, np.degrees(np.arcsin(Sy))))
-    logger.info("Cy , %1.4f, %1.4f" % (Cy, np.degrees(np.arcsin(Cy))))
     # Rotation Around X
     # If stages upsidedown (I24) change sign of Sx
-    Sx = Sx_dir * f2_z / fiducial_dict[chip_type][1]
+    Sx = Sx_dir * f2_z / fid_size_y
     Cx = np.sqrt((1 - Sx**2))
-    logger.info("Sx , %1.4f, %1.4f" % (Sx, np.degrees(np.arcsin(Sx))))
-    logger.info("Cx , %1.4f, %1.4f" % (Cx, np.degrees(np.arcsin(Cx))))
-
-    x1factor = mtr1_dir * scalex * (Cy * Cz)
-    y1factor = mtr2_dir * scaley * (-1.0 * Cx * Sz)
-    z1factor = mtr3_dir * scalez * Sy
 
-    x2factor = mtr1_dir * scalex * ((Sx * Sy * Cz) + (Cx * Sz))
-    y2factor = mtr2_dir * scaley * ((Cx * Cz) - (Sx * Sy * Sz))
-    z2factor = mtr3_dir * scalez * (-1.0 * Sx * Cy)
-
-    x3factor = mtr1_dir * scalex * ((Sx * Sz) - (Cx * Sy * Cz))
-    y3factor = mtr2_dir * scaley * ((Cx * Sy * Sz) + (Sx * Cz))
-    z3factor = mtr3_dir * scalez * (Cx * Cy)
+    # Work out all the angles, in degrees, in one go
+    labels = ("Sz1", "Sz2", "Sz", "Cz", "Sy", "Cy", "Sx", "Cx")
+    values = np.array([Sz1, Sz2, Sz, Cz, Sy, Cy, Sx, Cx, (Sz1 + Sz2) / 2])
+    angles = np.degrees(np.arcsin(values))
+    for label, value, angle in zip(labels, values, angles):
+        logger.info("%s , %1.4f, %1.4f", label, value, angle)
+
+    rotation = np.array(
+        [
+            [Cy * Cz, -1.0 * Cx * Sz, Sy],
+            [(Sx * Sy * Cz) + (Cx * Sz), (Cx * Cz) - (Sx * Sy * Sz), -1.0 * Sx * Cy],
+            [(Sx * Sz) - (Cx * Sy * Cz), (Cx * Sy * Sz) + (Sx * Cz), Cx * Cy],
+        ]
+    )
+    scales = np.array([scalex, scaley, scalez])
+    # Row n holds the (x, y, z) factors for motor n
+    factors = rotation * (np.array([mtr1_dir, mtr2_dir, mtr3_dir]) * scales)
 
     logger.info("Skew being used is: %1.4f" % skew)
-    s1 = np.degrees(np.arcsin(Sz1))
-    s2 = np.degrees(np.arcsin(Sz2))
-    rot = np.degrees(np.arcsin((Sz1 + Sz2) / 2))
+    s1, s2, rot = angles[0], angles[1], angles[-1]
     calc_skew = (s1 - rot) - (s2 - rot)
     logger.info("s1:%1.4f s2:%1.4f rot:%1.4f" % (s1, s2, rot))
     logger.info("Calculated rotation from current fiducials is: %1.4f" % rot)
@@ -898,35 +838,36 @@ def cs_maker(pmac: PMAC = inject("pmac")) -> MsgGenerator:
 
     sinD = np.sin((skew / 2) * (np.pi / 180))
     cosD = np.cos((skew / 2) * (np.pi / 180))
-    new_x1factor = (x1factor * cosD) + (y1factor * sinD)
-    new_y1factor = (x1factor * sinD) + (y1factor * cosD)
-    new_x2factor = (x2factor * cosD) + (y2factor * sinD)
-    new_y2factor = (x2factor * sinD) + (y2factor * cosD)
-
-    cs1 = "#1->%+1.3fX%+1.3fY%+1.3fZ" % (new_x1factor, new_y1factor, z1factor)
-    cs2 = "#2->%+1.3fX%+1.3fY%+1.3fZ" % (new_x2factor, new_y2factor, z2factor)
-    cs3 = "#3->%+1.3fX%+1.3fY%+1.3fZ" % (x3factor, y3factor, z3factor)
+    # Skew only applies to the x and y factors of motors 1 and 2
+    skewed_factors = factors.copy()
+    skewed_factors[:2, :2] = factors[:2, :2] @ np.array([[cosD, sinD], [sinD, cosD]])
+
+    cs1, cs2, cs3 = (
+        "#%d->%+1.3fX%+1.3fY%+1.3fZ" % (motor, *motor_factors)
+        for motor, motor_factors in enumerate(skewed_factors, start=1)
+    )
     logger.info("PMAC strings. \ncs1: %s \ncs2: %scs3: %s" % (cs1, cs2, cs3))
     logger.info(
         """These next values should be 1.
         This is the sum of the squares of the factors divided by their scale."""
     )
-    sqfact1 = np.sqrt(x1factor**2 + y1factor**2 + z1factor**2) / scalex
-    sqfact2 = np.sqrt(x2factor**2 + y2factor**2 + z2factor**2) / scaley
-    sqfact3 = np.sqrt(x3factor**2 + y3factor**2 + z3factor**2) / scalez
+    sqfact1, sqfact2, sqfact3 = np.linalg.norm(factors, axis=1) / scales
     logger.info("%1.4f \n %1.4f \n %1.4f" % (sqfact1, sqfact2, sqfact3))
     logger.debug("Long wait, please be patient")
-    yield from bps.trigger(pmac.to_xyz_zero)
-    sleep(2.5)
+    # Put completion on the PMAC string only means the command was accepted, not
+    # that the move has finished, so keep the waits. Sleep through the RunEngine
+    # so that it is not blocked meanwhile.
+    yield from bps.trigger(pmac.to_xyz_zero, wait=True)
+    yield from bps.sleep(2.5)
     yield from set_pmac_strings_for_cs(pmac, {"cs1": cs1, "cs2": cs2, "cs3": cs3})
-    yield from bps.trigger(pmac.to_xyz_zero)
-    sleep(0.1)
+    yield from bps.trigger(pmac.to_xyz_zero, wait=True)
+    yield from bps.sleep(0.1)
     yield from bps.trigger(pmac.home, wait=True)
-    sleep(0.1)
+    yield from bps.sleep(0.1)
     logger.debug("Chip_type is %s" % chip_type)
     if chip_type == 0:
         yield from bps.abs_set(pmac.pmac_string, "!x0.4y0.4", wait=True)
-        sleep(0.1)
+        yield from bps.sleep(0.1)
         yield from bps.trigger(pmac.home, wait=True)
     else:
         yield from bps.trigger(pmac.home, wait=True)
@@ -940,8 +881,7 @@ def cs_reset(pmac: PMAC = inject("pmac")) -> MsgGenerator:
     cs1 = "#1->10000X+0Y+0Z"
     cs2 = "#2->+0X-10000Y+0Z"
     cs3 = "#3->0X+0Y-10000Z"
-    strg = "\n".join([cs1, cs2, cs3])
-    print(strg)
+    logger.info("\n".join([cs1, cs2, cs3]))
     yield from set_pmac_strings_for_cs(pmac, {"cs1": cs1, "cs2": cs2, "cs3": cs3})
     logger.debug("CSreset Done")
     yield from bps.null()
@@ -977,20 +917,20 @@ def pumpprobe_calc() -> MsgGenerator:
     movetime = 0.008
     logger.info("X-ray exposure time %s" % exptime)
     logger.info("Laser dwell time %s" % pumpexptime)
-    repeat1 = 2 * 20 * (movetime + (pumpexptime + exptime) / 2)
-    repeat2 = 4 * 20 * (movetime + (pumpexptime + exptime) / 2)
-    repeat3 = 6 * 20 * (movetime + (pumpexptime + exptime) / 2)
-    repeat5 = 10 * 20 * (movetime + (pumpexptime + exptime) / 2)
-    repeat10 = 20 * 20 * (movetime + (pumpexptime + exptime) / 2)
-    for pv_name, repeat in (
-        (pv.me14e_gp104, repeat1),
-        (pv.me14e_gp105, repeat2),
-        (pv.me14e_gp106, repeat3),
-        (pv.me14e_gp107, repeat5),
-        (pv.me14e_gp108, repeat10),
-    ):
-        rounded = round(repeat, 4)
-        caput(pv_name, rounded)
+    # Times for repeat 1, 2, 3, 5 and 10
+    repeat_pvs = [
+        pv.me14e_gp104,
+        pv.me14e_gp105,
+        pv.me14e_gp106,
+        pv.me14e_gp107,
+        pv.me14e_gp108,
+    ]
+    repeats = (
+        np.array([2, 4, 6, 10, 20]) * 20 * (movetime + (pumpexptime + exptime) / 2)
+    )
+    rounded_repeats = repeats.round(4).tolist()
+    caput_many(repeat_pvs, rounded_repeats)
+    for pv_name, rounded in zip(repeat_pvs, rounded_repeats):
         logger.info("Repeat (%s): %s s" % (pv_name, rounded))
     # logger.info("repeat10 (%s): %s s" % (pv.me14e_gp108, round(repeat10, 4)))
     logger.debug("PP calculations done")
@@ -1001,40 +941,35 @@ def pumpprobe_calc() -> MsgGenerator:
 def block_check(pmac: PMAC = inject("pmac")) -> MsgGenerator:
     setup_logging()
     caput(pv.me14e_gp9, 0)
-    while True:
-        if int(caget(pv.me14e_gp9)) == 0:
-            chip_type = int(caget(pv.me14e_gp1))
-            if chip_type == ChipType.Minichip:
-                logger.info("Oxford mini chip in use.")
-                block_start_list = scrape_pvar_file("minichip_oxford.pvar")
-            elif chip_type == ChipType.Custom:
-                logger.error("This is a custom chip, no block check available!")
-                raise ValueError(
-                    "Chip type set to 'custom', which has no block check."
-                    "If not using a custom chip, please double check chip in the GUI."
-                )
-            else:
-                logger.warning("Default is Oxford chip block start list.")
-                block_start_list = scrape_pvar_file("oxford.pvar")
-            for entry in block_start_list:
-                if int(caget(pv.me14e_gp9)) != 0:
-                    logger.warning("Block Check Aborted")
-                    sleep(1.0)
-                    break
-                block, x, y = entry
-                logger.debug("Block: %s -> (x=%s y=%s)" % (block, x, y))
-                yield from bps.abs_set(pmac.pmac_string, f"!x{x}y{y}", wait=True)
-                time.sleep(0.4)
-        else:
-            logger.warning("Block Check Aborted due to GP 9 not equalling 0")
+    chip_type = int(caget(pv.me14e_gp1))
+    if chip_type == ChipType.Custom:
+        logger.error("This is a custom chip, no block check available!")
+        raise ValueError(
+            "Chip type set to 'custom', which has no block check."
+            "If not using a custom chip, please double check chip in the GUI."
+        )
+    pvar_file = BLOCK_CHECK_PVAR_FILES.get(chip_type)
+    if pvar_file is None:
+        logger.warning("Default is Oxford chip block start list.")
+        pvar_file = "oxford.pvar"
+    logger.info("Using block start list from %s" % pvar_file)
+    block_start_list = scrape_pvar_file(pvar_file)
+    # GP9 is the abort flag from the edm screen, checked before every move
+    for entry in block_start_list:
+        if int(caget(pv.me14e_gp9)) != 0:
+            logger.warning("Block Check Aborted")
+            sleep(1.0)
             break
-        break
+        block, x, y = entry
+        logger.debug("Block: %s -> (x=%s y=%s)" % (block, x, y))
+        yield from bps.abs_set(pmac.pmac_string, f"!x{x}y{y}", wait=True)
+        time.sleep(0.4)
     logger.debug("Block check done")
     yield from bps.null()
 
 
 def parse_args_and_run_parsed_function(args):
-    print(f"Run with {args}")
+    logger.info(f"Run with {args}")
     parser = argparse.ArgumentParser()
     subparsers = parser.add_subparsers(
         help="Choose command.",
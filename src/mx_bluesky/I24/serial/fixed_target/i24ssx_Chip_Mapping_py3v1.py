@@ -36,7 +36,7 @@ def read_file_make_dict(fid, chip_type, switch=False):
     a_dict = {}
     b_dict = {}
     with open(fid, "r") as f:
-        for line in f.readlines():
+        for line in f:
             if line.startswith("#"):
                 continue
             else:
@@ -89,6 +89,7 @@ def convert_chip_to_hex(fid, chip_type):
     chip_dict = read_file_make_dict(fid, chip_type, True)
     chip_format = get_format(chip_type)
     check_files(["%s.full" % chip_type])
+    full_lines = []
     with open("%s.full" % fid[:-5], "w") as g:
         # Normal
         if chip_type in [ChipType.Oxford, ChipType.OxfordInner]:
@@ -123,7 +124,7 @@ def convert_chip_to_hex(fid, chip_type):
                 hex_string = hex_string + pad * "0"
                 pvar = 5001 + i
                 line = "P%s=$%s" % (pvar, hex_string)
-                g.write(line + "\n")
+                full_lines.append(line + "\n")
                 logger.info("hex string: %s" % (hex_string + 4 * "0"))
                 logger.info("line number= %s" % i)
                 logger.info(
@@ -135,6 +136,7 @@ def convert_chip_to_hex(fid, chip_type):
                         "\n %s" % (40 * (" %i" % ((i / windows_per_block) + 2)))
                     )
             logger.info("hex_length: %s" % hex_length)
+            g.write("".join(full_lines))
         else:
             logger.warning("Chip type unknown, no conversion done.")
     return 0
@@ -6,7 +6,11 @@ import logging
 import os
 import string
 import time
+from copy import deepcopy
+from functools import lru_cache
+from itertools import product
 from pathlib import Path
+from random import getrandbits
 from typing import List
 
 import numpy as np
@@ -22,6 +26,32 @@ from mx_bluesky.I24.serial.parameters.constants import (
 
 logger = logging.getLogger("I24ssx.chip_startup")
 
+# Position of the characters used for the block rows and the window rows and
+# columns in the crystal addresses, eg. "A1_ab"
+BLOCK_ROW_INDEX = {c: i for i, c in enumerate(string.ascii_uppercase)}
+WINDOW_INDEX = {
+    c: i for i, c in enumerate(string.ascii_lowercase + string.ascii_uppercase + "0")
+}
+
+# Header of the .addr and .shot chip files, filled in from the parameters
+HEADER_TEMPLATE = (
+    "#23456789012345678901234567890123456789012345678901234567890123456789012345678901234567890\n#\n"
+    "#&i24\tchip_name    = {params.filename}\n"
+    "#&i24\tvisit        = {params.visit}\n"
+    "#&i24\tsub_dir      = {params.directory}\n"
+    "#&i24\tn_exposures  = {params.num_exposures}\n"
+    "#&i24\tchip_type    = {params.chip_type.value}\n"
+    "#&i24\tmap_type     = {params.map_type.value}\n"
+    "#&i24\tpump_repeat  = {params.pump_repeat.value}\n"
+    "#&i24\tpumpexptime  = {params.laser_dwell_s}\n"
+    "#&i24\texptime      = {params.laser_delay_s}\n"
+    "#&i24\tdcdetdist    = {params.detector_distance_mm}\n"
+    "#&i24\tprepumpexptime  = {params.pre_pump_exposure_s}\n"
+    "#&i24\tdet_Type     = {params.detector_name}\n"
+    "#\n"
+    "#XtalAddr      XCoord  YCoord  ZCoord  Present Shot  Spare04 Spare03 Spare02 Spare01\n"
+)
+
 
 def setup_logging():
     # Log should now change name daily.
@@ -29,61 +59,79 @@ def setup_logging():
     log.config(logfile)
 
 
+@lru_cache(maxsize=1)
+def _read_parameters_from_file(
+    params_file: Path, mtime_ns: int, size: int
+) -> FixedTargetParameters:
+    # The modification time and size are part of the cache key, so that the
+    # file is read again once it has been rewritten.
+    return FixedTargetParameters.from_file(params_file)
+
+
 def read_parameter_file(param_path: Path | str = PARAM_FILE_PATH_FT):
     if not isinstance(param_path, Path):
         param_path = Path(param_path)
     params_file = param_path / PARAM_FILE_NAME
-    params = FixedTargetParameters.from_file(params_file)
-    return params
+    file_stat = params_file.stat()
+    params = _read_parameters_from_file(
+        params_file, file_stat.st_mtime_ns, file_stat.st_size
+    )
+    # Hand out a copy so that callers cannot change the cached parameters
+    return deepcopy(params)
 
 
+# Chip fiducials and formats never change, so they are only worked out once
+@lru_cache(maxsize=None)
 @log.log_on_entry
-def fiducials(chip_type: int):
-    if chip_type in [ChipType.Oxford, ChipType.OxfordInner, ChipType.Minichip]:
-        fiducial_list: list = []
-        # No fiducial for custom
-    elif chip_type == ChipType.Custom:
+def fiducials(chip_type: int) -> tuple:
+    # None of the chips have fiducials
+    if chip_type == ChipType.Custom:
         logger.warning("No fiducials for custom chip")
-    else:
-        logger.warning(f"Unknown chip_type, {chip_type}, in fiducials")
-    return fiducial_list
+    elif chip_type not in [ChipType.Oxford, ChipType.OxfordInner, ChipType.Minichip]:
+        logger.warning("Unknown chip_type, %s, in fiducials", chip_type)
+    return ()
 
 
+@lru_cache(maxsize=None)
 @log.log_on_entry
-def get_format(chip_type: ChipType):
+def get_format(chip_type: ChipType) -> tuple:
     if chip_type == ChipType.Oxford:
         w2w = 0.125
         b2b_horz = 0.800
         b2b_vert = 0.800
-        chip_format = [8, 8, 20, 20]
+        chip_format = (8, 8, 20, 20)
     elif chip_type == ChipType.OxfordInner:
         w2w = 0.600
         b2b_horz = 0.0
         b2b_vert = 0.0
-        chip_format = [1, 1, 25, 25]
+        chip_format = (1, 1, 25, 25)
     elif chip_type == ChipType.Minichip:
         w2w = 0.125
         b2b_horz = 0
         b2b_vert = 0
-        chip_format = [1, 1, 20, 20]
+        chip_format = (1, 1, 20, 20)
     else:
         msg = f"Unknown chip_type, {chip_type}"
         logger.error(msg)
         raise ValueError(msg)
-    cell_format = chip_format + [w2w, b2b_horz, b2b_vert]
-    logger.info(f"Cell format for chip type {str(chip_type)}: {cell_format}")
+    cell_format = (*chip_format, w2w, b2b_horz, b2b_vert)
+    logger.info("Cell format for chip type %s: %s", chip_type, cell_format)
     return cell_format
 
 
-def get_xy(addr: str, chip_type: ChipType):
+def _get_block_and_window_indices(addr: str) -> tuple[int, int, int, int]:
     entry = addr.split("_")[-2:]
     R, C = entry[0][0], entry[0][1]
     r2, c2 = entry[1][0], entry[1][1]
-    blockR = string.ascii_uppercase.index(R)
+    blockR = BLOCK_ROW_INDEX[R]
     blockC = int(C) - 1
-    lowercase_list = list(string.ascii_lowercase + string.ascii_uppercase + "0")
-    windowR = lowercase_list.index(r2)
-    windowC = lowercase_list.index(c2)
+    windowR = WINDOW_INDEX[r2]
+    windowC = WINDOW_INDEX[c2]
+    return blockR, blockC, windowR, windowC
+
+
+def get_xy(addr: str, chip_type: ChipType):
+    blockR, blockC, windowR, windowC = _get_block_and_window_indices(addr)
 
     (
         x_block_num,
@@ -100,47 +148,49 @@ def get_xy(addr: str, chip_type: ChipType):
     return x, y
 
 
+def get_xy_positions(addr_list: List[str], chip_type: ChipType):
+    """Work out the (x, y) positions of a list of crystal addresses all at once, \
+        instead of calling get_xy on each of them.
+
+    Returns:
+        Two lists, with the x and the y positions.
+    """
+    indices = np.array(
+        [_get_block_and_window_indices(addr) for addr in addr_list], dtype=int
+    ).reshape(-1, 4)
+    blockR, blockC, windowR, windowC = indices.T
+
+    (
+        x_block_num,
+        y_block_num,
+        x_window_num,
+        y_window_num,
+        w2w,
+        b2b_horz,
+        b2b_vert,
+    ) = get_format(chip_type)
+
+    x = (blockC * b2b_horz) + (blockC * (x_window_num - 1) * w2w) + (windowC * w2w)
+    y = (blockR * b2b_vert) + (blockR * (y_window_num - 1) * w2w) + (windowR * w2w)
+    return x.tolist(), y.tolist()
+
+
 def pathli(l_in=[], way="typewriter", reverse=False):
-    if reverse is True:
-        li = list(reversed(l_in))
-    else:
-        li = list(l_in)
-    long_list = []
-    if li:
-        if way == "typewriter":
-            for i in range(len(li) ** 2):
-                long_list.append(li[i % len(li)])
-        elif way == "snake":
-            lr = list(reversed(li))
-            for rep in range(len(li)):
-                if rep % 2 == 0:
-                    long_list += li
-                else:
-                    long_list += lr
-        elif way == "snake53":
-            lr = list(reversed(li))
-            for rep in range(53):
-                if rep % 2 == 0:
-                    long_list += li
-                else:
-                    long_list += lr
-        elif way == "expand":
-            for entry in li:
-                for rep in range(len(li)):
-                    long_list.append(entry)
-        elif way == "expand28":
-            for entry in li:
-                for rep in range(28):
-                    long_list.append(entry)
-        elif way == "expand25":
-            for entry in li:
-                for rep in range(25):
-                    long_list.append(entry)
-        else:
-            logger.warning("No known path, way =  %s" % way)
-    else:
+    li = list(reversed(l_in)) if reverse is True else list(l_in)
+    if not li:
         logger.warning("No list written")
-    return long_list
+        return []
+    # The numbered paths have a fixed number of repeats, the others one per entry
+    repeats = {"snake53": 53, "expand28": 28, "expand25": 25}.get(way, len(li))
+    if way == "typewriter":
+        return li * len(li)
+    elif way in ("snake", "snake53"):
+        lr = li[::-1]
+        return [entry for rep in range(repeats) for entry in (lr if rep % 2 else li)]
+    elif way in ("expand", "expand28", "expand25"):
+        return [entry for entry in li for _ in range(repeats)]
+    logger.warning("No known path, way =  %s", way)
+    return []
 
 
 def zippum(list_1_args, list_2_args):
@@ -148,10 +198,7 @@ def zippum(list_1_args, list_2_args):
     list_2, type_2, reverse_2 = list_2_args
     A_path = pathli(list_1, type_1, reverse_1)
     B_path = pathli(list_2, type_2, reverse_2)
-    zipped_list = []
-    for a, b in zip(A_path, B_path):
-        zipped_list.append(a + b)
-    return zipped_list
+    return [a + b for a, b in zip(A_path, B_path)]
 
 
 def get_alphanumeric(chip_type: ChipType):
@@ -164,16 +211,14 @@ def get_alphanumeric(chip_type: ChipType):
     ]
     number_list = [str(x) for x in range(1, blk_num + 1)]
 
-    block_list = zippum([uppercase_list, "expand", 0], [number_list, "typewriter", 0])
-    window_list = zippum(
-        [lowercase_list, "expand", 0], [lowercase_list, "typewriter", 0]
-    )
-
-    alphanumeric_list = []
-    for block in block_list:
-        for window in window_list:
-            alphanumeric_list.append(block + "_" + window)
-    logger.info("Length of alphanumeric list = %s" % len(alphanumeric_list))
+    # Blocks row by row, and the windows in each block row by row
+    alphanumeric_list = [
+        f"{row}{column}_{window_row}{window_column}"
+        for row, column, window_row, window_column in product(
+            uppercase_list, number_list, lowercase_list, lowercase_list
+        )
+    ]
+    logger.info("Length of alphanumeric list = %s", len(alphanumeric_list))
     return alphanumeric_list
 
 
@@ -192,26 +237,14 @@ def get_shot_order(chip_type: ChipType):
     window_dn = zippum([lowercase_list, "expand", 0], [lowercase_list, "snake", 0])
     window_up = zippum([lowercase_list, "expand", 1], [lowercase_list, "snake", 0])
 
-    switch = 0
-    count = 0
-    collect_list = []
-    for block in block_list:
-        if switch == 0:
-            for window in window_dn:
-                collect_list.append(block + "_" + window)
-            count += 1
-            if count == blk_num:
-                count = 0
-                switch = 1
-        else:
-            for window in window_up:
-                collect_list.append(block + "_" + window)
-            count += 1
-            if count == blk_num:
-                count = 0
-                switch = 0
-
-    logger.info("Length of collect list = %s" % len(collect_list))
+    # Windows are shot down then up on alternate rows of blocks
+    collect_list = [
+        f"{block}_{window}"
+        for i, block in enumerate(block_list)
+        for window in (window_up if (i // blk_num) % 2 else window_dn)
+    ]
+
+    logger.info("Length of collect list = %s", len(collect_list))
     return collect_list
 
 
@@ -238,21 +271,22 @@ def write_file(
     elif order == "shot":
         addr_list = get_shot_order(params.chip_type)
 
-    with open(chip_file_path, "a") as g:
-        for addr in addr_list:
-            xtal_name = "_".join([params.filename, addr])
-            (x, y) = get_xy(xtal_name, params.chip_type)
-            if addr in fiducial_list:
-                pres = "0"
+    lines = []
+    x_positions, y_positions = get_xy_positions(addr_list, params.chip_type)
+    for addr, x, y in zip(addr_list, x_positions, y_positions):
+        xtal_name = "_".join([params.filename, addr])
+        if addr in fiducial_list:
+            pres = "0"
+        else:
+            if "rand" in suffix:
+                pres = str(getrandbits(1))
             else:
-                if "rand" in suffix:
-                    pres = str(np.random.randint(2))
-                else:
-                    pres = "-1"
-            line = "\t".join([xtal_name, str(x), str(y), "0.0", pres]) + "\n"
-            g.write(line)
+                pres = "-1"
+        lines.append("\t".join([xtal_name, str(x), str(y), "0.0", pres]) + "\n")
+    with open(chip_file_path, "a") as g:
+        g.write("".join(lines))
 
-    logger.info("Write %s completed" % chip_file_path)
+    logger.info("Write %s completed", chip_file_path)
 
 
 @log.log_on_entry
@@ -282,7 +316,7 @@ def check_files(
                 full_fid.parent / f"{time_str}_{params.filename}{full_fid.suffix}"
             )
             # FIXME hack / fix. Actually move the file
-            logger.info(f"File {full_fid} Already Exists")
+            logger.info("File %s Already Exists", full_fid)
     logger.debug("Check files done")
     return 1
 
@@ -298,28 +332,9 @@ def write_headers(
         params = read_parameter_file(param_file_path)
         chip_file_path = save_path / f"chips/{params.directory}/{params.filename}"
 
+        header = HEADER_TEMPLATE.format(params=params)
         for suffix in suffix_list:
-            full_fid = chip_file_path.with_suffix(suffix)
-            with open(full_fid, "w") as g:
-                g.write(
-                    "#23456789012345678901234567890123456789012345678901234567890123456789012345678901234567890\n#\n"
-                )
-                g.write(f"#&i24\tchip_name    = {params.filename}\n")
-                g.write(f"#&i24\tvisit        = {params.visit}\n")
-                g.write(f"#&i24\tsub_dir      = {params.directory}\n")
-                g.write(f"#&i24\tn_exposures  = {params.num_exposures}\n")
-                g.write(f"#&i24\tchip_type    = {params.chip_type.value}\n")
-                g.write(f"#&i24\tmap_type     = {params.map_type.value}\n")
-                g.write(f"#&i24\tpump_repeat  = {params.pump_repeat.value}\n")
-                g.write(f"#&i24\tpumpexptime  = {params.laser_dwell_s}\n")
-                g.write(f"#&i24\texptime      = {params.laser_delay_s}\n")
-                g.write(f"#&i24\tdcdetdist    = {params.detector_distance_mm}\n")
-                g.write(f"#&i24\tprepumpexptime  = {params.pre_pump_exposure_s}\n")
-                g.write(f"#&i24\tdet_Type     = {params.detector_name}\n")
-                g.write("#\n")
-                g.write(
-                    "#XtalAddr      XCoord  YCoord  ZCoord  Present Shot  Spare04 Spare03 Spare02 Spare01\n"
-                )
+            chip_file_path.with_suffix(suffix).write_text(header)
     else:
         msg = "Unknown location, %s" % location
         logger.error(msg)
@@ -4,9 +4,14 @@ Robin Owen 12 Jan 2021
 """
 
 import logging
+import threading
+from collections.abc import Callable
+from functools import partial
 
 import bluesky.plan_stubs as bps
 import cv2 as cv
+import numpy as np
+from blueapi.core import MsgGenerator
 from bluesky.run_engine import RunEngine
 from dodal.beamlines import i24
 from dodal.devices.i24.pmac import PMAC
@@ -22,6 +27,16 @@ logger = logging.getLogger("I24ssx.moveonclick")
 # TODO See https://github.com/DiamondLightSource/mx_bluesky/issues/44
 zoomcalibrator = 6  # 8 seems to work well for zoom 2
 
+# Jog commands for the stage motors bound to keys in the viewer
+JOG_X_NEG = "#1J:-10"
+JOG_X_POS = "#1J:10"
+JOG_Y_NEG = "#2J:-10"
+JOG_Y_POS = "#2J:10"
+FOCUS_IN = "#3J:-150"
+FOCUS_OUT = "#3J:150"
+FOCUS_IN_LARGE = "#3J:-1000"
+FOCUS_OUT_LARGE = "#3J:1000"
+
 
 def _get_beam_centre(oav: OAV):
     """Extract the beam centre x/y positions from the display.configuration file.
@@ -36,21 +51,19 @@ def _get_beam_centre(oav: OAV):
 def onMouse(event, x, y, flags, param):
     if event == cv.EVENT_LBUTTONUP:
         pmac = param[0]
-        oav = param[1]
-        beamX, beamY = _get_beam_centre(oav)
+        beamX, beamY = param[1]
         logger.info("Clicked X and Y %s %s" % (x, y))
         xmove = -1 * (beamX - x) * zoomcalibrator
         ymove = -1 * (beamY - y) * zoomcalibrator
         logger.info("Moving X and Y %s %s" % (xmove, ymove))
-        xmovepmacstring = "#1J:" + str(xmove)
-        ymovepmacstring = "#2J:" + str(ymove)
+        xmovepmacstring = f"#1J:{xmove}"
+        ymovepmacstring = f"#2J:{ymove}"
         yield from bps.abs_set(pmac.pmac_string, xmovepmacstring, wait=True)
         yield from bps.abs_set(pmac.pmac_string, ymovepmacstring, wait=True)
 
 
-def update_ui(oav, frame):
-    # Get beam x and y values
-    beamX, beamY = _get_beam_centre(oav)
+def draw_overlay(frame, beam_centre: tuple[int, int]):
+    beamX, beamY = beam_centre
 
     # Overlay text and beam centre
     cv.ellipse(
@@ -119,7 +132,7 @@ def update_ui(oav, frame):
     )
     cv.putText(
         frame,
-        "esc : close window",
+        "K : block check",
         (25, 170),
         cv.FONT_HERSHEY_COMPLEX_SMALL,
         0.8,
@@ -127,9 +140,108 @@ def update_ui(oav, frame):
         1,
         1,
     )
+    cv.putText(
+        frame,
+        "R : refresh beam centre",
+        (25, 190),
+        cv.FONT_HERSHEY_COMPLEX_SMALL,
+        0.8,
+        (0, 255, 255),
+        1,
+        1,
+    )
+    cv.putText(
+        frame,
+        "esc : close window",
+        (25, 210),
+        cv.FONT_HERSHEY_COMPLEX_SMALL,
+        0.8,
+        (0, 255, 255),
+        1,
+        1,
+    )
+
+
+def make_overlay(frame_shape: tuple[int, ...], beam_centre: tuple[int, int]):
+    """Draw the beam centre and key bindings once on a blank image, and return it \
+    together with the mask of the pixels drawn on it."""
+    hud = np.zeros(frame_shape, dtype=np.uint8)
+    draw_overlay(hud, beam_centre)
+    return hud, hud.any(axis=-1)
+
+
+def update_ui(frame, overlay):
+    hud, mask = overlay
+    frame[mask] = hud[mask]
     cv.imshow("OAV1view", frame)
 
 
+def _set_current_position_as_origin(pmac: PMAC):
+    yield from bps.trigger(pmac.home, wait=True)
+    print("Current position set as origin")
+
+
+def get_key_bindings(pmac: PMAC) -> dict[int, Callable[[], MsgGenerator]]:
+    """Map the keys of the viewer window to the plans they run."""
+    return {
+        113: partial(manager.moveto, Fiducials.zero, pmac),  # Q
+        119: partial(manager.moveto, Fiducials.fid1, pmac),  # W
+        101: partial(manager.moveto, Fiducials.fid2, pmac),  # E
+        97: partial(_set_current_position_as_origin, pmac),  # A
+        115: partial(manager.fiducial, 1, pmac),  # S
+        100: partial(manager.fiducial, 2, pmac),  # D
+        99: partial(manager.cs_maker, pmac),  # C
+        # doesn't work well for blockcheck as image doesn't update
+        107: partial(manager.block_check, pmac),  # K
+        104: partial(bps.abs_set, pmac.pmac_string, JOG_Y_NEG, wait=True),  # H
+        110: partial(bps.abs_set, pmac.pmac_string, JOG_Y_POS, wait=True),  # N
+        109: partial(bps.abs_set, pmac.pmac_string, JOG_X_NEG, wait=True),  # M
+        98: partial(bps.abs_set, pmac.pmac_string, JOG_X_POS, wait=True),  # B
+        105: partial(bps.abs_set, pmac.pmac_string, FOCUS_IN, wait=True),  # I
+        111: partial(bps.abs_set, pmac.pmac_string, FOCUS_OUT, wait=True),  # O
+        117: partial(bps.abs_set, pmac.pmac_string, FOCUS_IN_LARGE, wait=True),  # U
+        112: partial(bps.abs_set, pmac.pmac_string, FOCUS_OUT_LARGE, wait=True),  # P
+    }
+
+
+class FrameReader:
+    """Read frames from a video capture on a background thread, only keeping the \
+    latest one, so that the viewer does not have to wait for the camera stream."""
+
+    def __init__(self, cap: cv.VideoCapture):
+        self._cap = cap
+        self._frame = None
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._read_frames, daemon=True)
+
+    def _read_frames(self):
+        while not self._stopped.is_set():
+            success, frame = self._cap.read()
+            if not success:
+                self._stopped.set()
+                break
+            with self._lock:
+                self._frame = frame
+
+    @property
+    def running(self) -> bool:
+        return not self._stopped.is_set()
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        self._thread.join()
+
+    def latest(self):
+        """Return the latest frame, or None if there is no new one since last call."""
+        with self._lock:
+            frame, self._frame = self._frame, None
+        return frame
+
+
 def start_viewer(oav1: str = OAV1_CAM):
     # Get devices out of dodal
     oav: OAV = i24.oav()
@@ -137,60 +249,52 @@ def start_viewer(oav1: str = OAV1_CAM):
     # Create a video caputure from OAV1
     cap = cv.VideoCapture(oav1)
 
+    # Read the beam centre once, it can be refreshed with the R key
+    callback_params = [pmac, _get_beam_centre(oav)]
+
     # Create window named OAV1view and set onmouse to this
     cv.namedWindow("OAV1view")
-    cv.setMouseCallback("OAV1view", onMouse, param=[pmac, oav])  # type: ignore
+    cv.setMouseCallback("OAV1view", onMouse, param=callback_params)  # type: ignore
 
     logger.info("Showing camera feed. Press escape to close")
     # Read captured video and store them in success and frame
     success, frame = cap.read()
+    if not success:
+        logger.error("Unable to read from the camera feed %s" % oav1)
+        cap.release()
+        return
+    overlay = make_overlay(frame.shape, callback_params[1])
+    key_bindings = get_key_bindings(pmac)
+
+    # Read the following frames in the background
+    reader = FrameReader(cap)
+    reader.start()
 
     # Loop until escape key is pressed. Keyboard shortcuts here
-    while success:
-        success, frame = cap.read()
-
-        update_ui(oav, frame)
-
-        k = cv.waitKey(1)
-        if k == 113:  # Q
-            yield from manager.moveto(Fiducials.zero, pmac)
-        if k == 119:  # W
-            yield from manager.moveto(Fiducials.fid1, pmac)
-        if k == 101:  # E
-            yield from manager.moveto(Fiducials.fid2, pmac)
-        if k == 97:  # A
-            yield from bps.trigger(pmac.home, wait=True)
-            print("Current position set as origin")
-        if k == 115:  # S
-            yield from manager.fiducial(1)
-        if k == 100:  # D
-            yield from manager.fiducial(2)
-        if k == 99:  # C
-            yield from manager.cs_maker(pmac)
-        if k == 98:  # B
-            yield from manager.block_check()  # doesn't work well for blockcheck as image doesn't update
-        if k == 104:  # H
-            yield from bps.abs_set(pmac.pmac_string, "#2J:-10", wait=True)
-        if k == 110:  # N
-            yield from bps.abs_set(pmac.pmac_string, "#2J:10", wait=True)
-        if k == 109:  # M
-            yield from bps.abs_set(pmac.pmac_string, "#1J:-10", wait=True)
-        if k == 98:  # B
-            yield from bps.abs_set(pmac.pmac_string, "#1J:10", wait=True)
-        if k == 105:  # I
-            yield from bps.abs_set(pmac.pmac_string, "#3J:-150", wait=True)
-        if k == 111:  # O
-            yield from bps.abs_set(pmac.pmac_string, "#3J:150", wait=True)
-        if k == 117:  # U
-            yield from bps.abs_set(pmac.pmac_string, "#3J:-1000", wait=True)
-        if k == 112:  # P
-            yield from bps.abs_set(pmac.pmac_string, "#3J:1000", wait=True)
+    while reader.running:
+        frame = reader.latest()
+        if frame is not None:
+            update_ui(frame, overlay)
+            # Handle window events without waiting, the next frame may be ready
+            k = cv.pollKey()
+        else:
+            k = cv.waitKey(1)
+
+        if k == -1:
+            continue
+        if k in key_bindings:
+            yield from key_bindings[k]()
+        if k == 114:  # R
+            callback_params[1] = _get_beam_centre(oav)
+            overlay = make_overlay(overlay[0].shape, callback_params[1])
+            logger.info("Beam centre refreshed: %s %s" % callback_params[1])
         if k == 0x1B:  # esc
             cv.destroyWindow("OAV1view")
             print("Pressed escape. Closing window")
             break
 
-    # Clear cameraCapture instance
+    # Stop reading frames and clear cameraCapture instance
+    reader.stop()
     cap.release()
 
 
@@ -1,6 +1,7 @@
 import functools
 import logging
 import logging.config
+from datetime import date
 from os import environ
 from pathlib import Path
 from typing import Optional
@@ -13,6 +14,8 @@ from dodal.log import (
 from dodal.log import LOGGER as dodal_logger
 
 VISIT_PATH = Path("/dls_sw/i24/etc/ssx_current_visit.txt")
+# Log directory used when not running on a beamline
+_LOG_DIR = Path("./tmp/logs/")
 
 # Logging set up
 logger = logging.getLogger("I24ssx")
@@ -45,7 +48,11 @@ logging_config = {
     },
 }
 
-logging.config.dictConfig(logging_config)
+# Plans set up logging every time they run, so keep track of what has been set up.
+# The console handler is only configured on the first call to config, so that
+# importing this module does not change the logging set up.
+_default_logging_set_up = False
+_file_handler_dates: dict[logging.FileHandler, date] = {}
 
 
 def _read_visit_directory_from_file() -> Path:
@@ -68,9 +75,9 @@ def _get_logging_file_path() -> Path:
     if beamline:
         logging_path = _read_visit_directory_from_file() / "tmp/serial/logs"
     else:
-        logging_path = Path("./tmp/logs/")
+        logging_path = _LOG_DIR
 
-    Path(logging_path).mkdir(parents=True, exist_ok=True)
+    logging_path.mkdir(parents=True, exist_ok=True)
     return logging_path
 
 
@@ -111,10 +118,25 @@ def config(
         dev_mode (bool, optional): If true, will log to graylog on localhost instead \
             of production. Defaults to False.
     """
-    default_logging_setup(dev_mode=dev_mode)
+    global _default_logging_set_up
+    if not _default_logging_set_up:
+        logging.config.dictConfig(logging_config)
+        default_logging_setup(dev_mode=dev_mode)
+        _default_logging_set_up = True
 
     if logfile:
         logs = _get_logging_file_path() / logfile
+        today = date.today()
+        for handler in logger.handlers.copy():
+            if not isinstance(handler, logging.FileHandler):
+                continue
+            if Path(handler.baseFilename) == logs.absolute():
+                return
+            # Log file names change daily, stop writing to the previous day's files
+            if _file_handler_dates.get(handler, today) != today:
+                logger.removeHandler(handler)
+                handler.close()
+                _file_handler_dates.pop(handler)
         fileFormatter = logging.Formatter(
             "%(asctime)s %(levelname)s: \t(%(name)s) %(message)s",
             datefmt="%d-%m-%Y %I:%M:%S",
@@ -123,12 +145,15 @@ def config(
         FH.setLevel(logging.DEBUG)
         FH.setFormatter(fileFormatter)
         logger.addHandler(FH)
+        _file_handler_dates[FH] = today
 
 
 def log_on_entry(func):
+    # Look up the function name once when decorating, not on every call
+    name = func.__name__
+
     @functools.wraps(func)
     def decorator(*args, **kwargs):
-        name = func.__name__
         logger.debug("Running %s " % name)
         return func(*args, **kwargs)
 
@@ -1,4 +1,5 @@
 from enum import Enum
+from importlib.resources import files
 from os import environ
 from pathlib import Path
 from typing import Optional
@@ -18,9 +19,9 @@ OAV_CONFIG_FILES = {
 }
 OAV1_CAM = "http://bl24i-di-serv-01.diamond.ac.uk:8080/OAV1.mjpg.mjpg"
 
-HEADER_FILES_PATH = Path("/dls_sw/i24/scripts/fastchips/").expanduser().resolve()
+HEADER_FILES_PATH = Path("/dls_sw/i24/scripts/fastchips/")
 
-INTERNAL_FILES_PATH = Path(__file__).absolute().parent
+INTERNAL_FILES_PATH = Path(str(files(__package__)))
 
 
 def _params_file_location() -> Path:
@@ -1,11 +1,13 @@
 from . import pv, setup_beamline
-from .ca import caget, cagetstring, caput
+from .ca import caget, caget_many, cagetstring, caput, caput_many
 from .pv_abstract import Detector, Eiger, Pilatus
 
 __all__ = [
     "caget",
+    "caget_many",
     "cagetstring",
     "caput",
+    "caput_many",
     "Detector",
     "Eiger",
     "Pilatus",
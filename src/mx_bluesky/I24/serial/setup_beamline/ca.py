@@ -30,6 +30,22 @@ def caget(pv):
     return val
 
 
+def caget_many(pvs):
+    # A single caget call for all the PVs, falling back to the retrying caget for
+    # any PV missing from the output.
+    vals = {}
+    try:
+        a = Popen(["caget", *pvs], stdout=PIPE, stderr=PIPE)
+        a_stdout, a_stderr = a.communicate()
+        for line in a_stdout.decode("ascii").splitlines():
+            entry = line.split()
+            if len(entry) > 1:
+                vals[entry[0]] = entry[1]
+    except Exception:
+        print("Exception in ca_py3.py caget_many, reading PVs one by one")
+    return [vals[pv] if pv in vals else caget(pv) for pv in pvs]
+
+
 def caput(pv, new_val):
     check = Popen(["cainfo", pv], stdout=PIPE, stderr=PIPE)
     # print('check', check)
@@ -42,6 +58,22 @@ def caput(pv, new_val):
         a_stdout, a_stderr = a.communicate()
 
 
+def caput_many(pvs, new_vals):
+    # Run all the cainfo checks and then all the caputs concurrently, only waiting
+    # for them to finish once at the end of each stage.
+    checks = [Popen(["cainfo", pv], stdout=PIPE, stderr=PIPE) for pv in pvs]
+    puts = []
+    for pv, new_val, check in zip(pvs, new_vals, checks):
+        check_stdout, check_stderr = check.communicate()
+        if check_stdout.split()[11].decode("ascii") == "DBF_CHAR":
+            cmd = ["caput", "-S", pv, str(new_val)]
+        else:
+            cmd = ["caput", pv, str(new_val)]
+        puts.append(Popen(cmd, stdout=PIPE, stderr=PIPE))
+    for a in puts:
+        a_stdout, a_stderr = a.communicate()
+
+
 def evaluate(val):
     try:
         int(val)
@@ -10,6 +10,7 @@ schematics corresponds to soft_in_2 in the code.
 """
 
 import logging
+from enum import IntEnum
 from typing import Tuple
 
 import bluesky.plan_stubs as bps
@@ -41,10 +42,25 @@ TTL_EIGER = 1
 TTL_PILATUS = 2
 TTL_FAST_SHUTTER = 4
 
-SHUTTER_MODE = {
-    "manual": SoftInState.NO,
-    "auto": SoftInState.YES,
+# Outputs used for the detector and laser triggers, depending on the detector in use
+DETECTOR_AND_LASER_TTL = {
+    "eiger": (TTL_EIGER, TTL_PILATUS),
+    "pilatus": (TTL_PILATUS, TTL_EIGER),
 }
+# Drop in the eiger pulse width needed for the square wave to work
+EIGER_PULSE_WIDTH_DROP = 0.0001
+
+
+class ShutterMode(IntEnum):
+    MANUAL = 0
+    AUTO = 1
+
+    def __str__(self) -> str:
+        return self.name.lower()
+
+
+# Soft input 1 state for each shutter mode, indexed by ShutterMode
+SHUTTER_MODE = (SoftInState.NO, SoftInState.YES)
 
 GATE_START = 1.0
 SHUTTER_OPEN_TIME = 0.05  # For pp with long delays
@@ -70,12 +86,28 @@ def get_zebra_settings_for_extruder(
     return gate_width, gate_step
 
 
+def get_detector_and_laser_ttl(det_type: str) -> Tuple[int, int]:
+    """Get the zebra TTL outputs to use to trigger the detector and the laser."""
+    try:
+        return DETECTOR_AND_LASER_TTL[det_type]
+    except KeyError:
+        raise ValueError(f"Unknown detector type {det_type}.") from None
+
+
 def arm_zebra(zebra: Zebra):
+    # Read the live state rather than caching it, the zebra disarms by itself at
+    # the end of a collection
+    if (yield from bps.rd(zebra.pc.arm.armed)) == 1:
+        logger.info("Zebra already armed.")
+        return
     yield from bps.abs_set(zebra.pc.arm, ArmDemand.ARM, wait=True)
     logger.info("Zebra armed.")
 
 
 def disarm_zebra(zebra: Zebra):
+    if (yield from bps.rd(zebra.pc.arm.armed)) == 0:
+        logger.info("Zebra already disarmed.")
+        return
     yield from bps.abs_set(zebra.pc.arm, ArmDemand.DISARM, wait=True)
     logger.info("Zebra disarmed.")
 
@@ -90,18 +122,27 @@ def close_fast_shutter(zebra: Zebra):
     logger.info("Fast shutter closed.")
 
 
-def set_shutter_mode(zebra: Zebra, mode: str):
+def set_shutter_mode(
+    zebra: Zebra, mode: ShutterMode, group: str = "set_shutter_mode", wait: bool = True
+):
     # SOFT_IN:B0 has to be disabled for manual mode
-    yield from bps.abs_set(zebra.inputs.soft_in_1, SHUTTER_MODE[mode], wait=True)
-    logger.info(f"Shutter mode set to {mode}.")
+    yield from bps.abs_set(zebra.inputs.soft_in_1, SHUTTER_MODE[mode], group=group)
+    if wait:
+        yield from bps.wait(group)
+    logger.info("Shutter mode set to %s.", mode)
 
 
 def setup_pc_sources(
-    zebra: Zebra, gate_source: int, pulse_source: int, group: str = "pc_sources"
+    zebra: Zebra,
+    gate_source: int,
+    pulse_source: int,
+    group: str = "pc_sources",
+    wait: bool = True,
 ):
     yield from bps.abs_set(zebra.pc.gate_source, gate_source, group=group)
     yield from bps.abs_set(zebra.pc.pulse_source, pulse_source, group=group)
-    yield from bps.wait(group)
+    if wait:
+        yield from bps.wait(group)
 
 
 def setup_zebra_for_quickshot_plan(
@@ -124,15 +165,17 @@ def setup_zebra_for_quickshot_plan(
     """
     logger.info("Setup ZEBRA for quickshot collection.")
     yield from bps.abs_set(zebra.pc.arm_source, ArmSource.SOFT, group=group)
-    yield from setup_pc_sources(zebra, TrigSource.TIME, TrigSource.EXTERNAL)
+    yield from setup_pc_sources(
+        zebra, TrigSource.TIME, TrigSource.EXTERNAL, group=group, wait=False
+    )
 
     gate_width = exp_time * num_images + 0.5
-    logger.info(f"Gate start set to {GATE_START}, with width {gate_width}.")
+    logger.info("Gate start set to %s, with width %s.", GATE_START, gate_width)
     yield from bps.abs_set(zebra.pc.gate_start, GATE_START, group=group)
     yield from bps.abs_set(zebra.pc.gate_width, gate_width, group=group)
 
+    # The puts complete once the IOC has processed them, so no extra settle time
     yield from bps.abs_set(zebra.pc.gate_input, SOFT_IN2, group=group)
-    yield from bps.sleep(0.1)
 
     if wait:
         yield from bps.wait(group)
@@ -140,7 +183,7 @@ def setup_zebra_for_quickshot_plan(
 
 
 def set_logic_gates_for_porto_triggering(
-    zebra: Zebra, group: str = "porto_logic_gates"
+    zebra: Zebra, group: str = "porto_logic_gates", wait: bool = True
 ):
     # To OUT2_TTL
     yield from bps.abs_set(
@@ -156,7 +199,8 @@ def set_logic_gates_for_porto_triggering(
     yield from bps.abs_set(
         zebra.logic_gates.and_gates[4].sources[2], PULSE2, group=group
     )
-    yield from bps.wait(group=group)
+    if wait:
+        yield from bps.wait(group=group)
 
 
 def setup_zebra_for_extruder_with_pump_probe_plan(
@@ -203,18 +247,19 @@ def setup_zebra_for_extruder_with_pump_probe_plan(
             gate start. Defaults to 0.0.
     """
     logger.info("Setup ZEBRA for pump probe extruder collection.")
+    DET_TTL, LASER_TTL = get_detector_and_laser_ttl(det_type)
 
-    yield from set_shutter_mode(zebra, "manual")
+    yield from set_shutter_mode(zebra, ShutterMode.MANUAL, group=group, wait=False)
 
     # Set gate to "Time" and pulse source to "External"
-    yield from setup_pc_sources(zebra, TrigSource.TIME, TrigSource.EXTERNAL)
+    yield from setup_pc_sources(
+        zebra, TrigSource.TIME, TrigSource.EXTERNAL, group=group, wait=False
+    )
 
     # Logic gates
-    yield from set_logic_gates_for_porto_triggering(zebra)
+    yield from set_logic_gates_for_porto_triggering(zebra, group=group, wait=False)
 
     # Set TTL out depending on detector type
-    DET_TTL = TTL_EIGER if det_type == "eiger" else TTL_PILATUS
-    LASER_TTL = TTL_PILATUS if det_type == "eiger" else TTL_EIGER
     yield from bps.abs_set(zebra.output.out_pvs[DET_TTL], AND4, group=group)
     yield from bps.abs_set(zebra.output.out_pvs[LASER_TTL], AND3, group=group)
 
@@ -224,10 +269,10 @@ def setup_zebra_for_extruder_with_pump_probe_plan(
         exp_time, pump_exp, pump_delay
     )
     logger.info(
-        f"""
-        Gate start set to {GATE_START}, with calculated width {gate_width}
-        and step {gate_step}.
-        """
+        "Gate start set to %s, with calculated width %s and step %s.",
+        GATE_START,
+        gate_width,
+        gate_step,
     )
     yield from bps.abs_set(zebra.pc.gate_start, GATE_START, group=group)
     yield from bps.abs_set(zebra.pc.gate_width, gate_width, group=group)
@@ -239,16 +284,17 @@ def setup_zebra_for_extruder_with_pump_probe_plan(
     # PULSE1_DLY is the start (0 usually), PULSE1_WID is the laser dwell set on edm
     # PULSE2_DLY is the laser delay set on edm, PULSE2_WID is the exposure time
     logger.info(
-        f"Pulse1 starting at {pulse1_delay} with width set to laser dwell {pump_exp}."
+        "Pulse1 starting at %s with width set to laser dwell %s.",
+        pulse1_delay,
+        pump_exp,
     )
     yield from bps.abs_set(zebra.output.pulse_1.input, PC_GATE, group=group)
     yield from bps.abs_set(zebra.output.pulse_1.delay, pulse1_delay, group=group)
     yield from bps.abs_set(zebra.output.pulse_1.width, pump_exp, group=group)
     logger.info(
-        f"""
-        Pulse2 starting at laser delay {pump_delay} with width set to \
-        exposure time {exp_time}.
-        """
+        "Pulse2 starting at laser delay %s with width set to exposure time %s.",
+        pump_delay,
+        exp_time,
     )
     yield from bps.abs_set(zebra.output.pulse_2.input, PC_GATE, group=group)
     yield from bps.abs_set(zebra.output.pulse_2.delay, pump_delay, group=group)
@@ -300,10 +346,13 @@ def setup_zebra_for_fastchip_plan(
             Defaults to 0.0 (standard chip collection).
     """
     logger.info("Setup ZEBRA for a fixed target collection.")
+    DET_TTL, _ = get_detector_and_laser_ttl(det_type)
 
-    yield from set_shutter_mode(zebra, "manual")
+    yield from set_shutter_mode(zebra, ShutterMode.MANUAL, group=group, wait=False)
 
-    yield from setup_pc_sources(zebra, TrigSource.EXTERNAL, TrigSource.TIME)
+    yield from setup_pc_sources(
+        zebra, TrigSource.EXTERNAL, TrigSource.TIME, group=group, wait=False
+    )
 
     # Logic Gates
     yield from bps.abs_set(
@@ -317,13 +366,14 @@ def setup_zebra_for_fastchip_plan(
 
     # Set TTL out depending on detector type
     # And calculate some of the other settings
-    if det_type == "eiger":
-        yield from bps.abs_set(zebra.output.out_pvs[TTL_EIGER], AND3, group=group)
-    if det_type == "pilatus":
-        yield from bps.abs_set(zebra.output.out_pvs[TTL_PILATUS], AND3, group=group)
+    yield from bps.abs_set(zebra.output.out_pvs[DET_TTL], AND3, group=group)
 
     # Square wave - needs a small drop to make it work for eiger
-    pulse_width = exposure_time - 0.0001 if det_type == "eiger" else exposure_time / 2
+    pulse_width = (
+        exposure_time - EIGER_PULSE_WIDTH_DROP
+        if det_type == "eiger"
+        else exposure_time / 2
+    )
 
     # 100us buffer needed to avoid missing some of the triggers
     exptime_buffer = exposure_time + 0.0001
@@ -386,14 +436,17 @@ def open_fast_shutter_at_each_position_plan(
     logger.debug("Finished setting up for long delays.")
 
 
-def reset_pc_gate_and_pulse(zebra: Zebra, group: str = "reset_pc"):
+def reset_pc_gate_and_pulse(zebra: Zebra, group: str = "reset_pc", wait: bool = True):
     yield from bps.abs_set(zebra.pc.gate_start, 0, group=group)
     yield from bps.abs_set(zebra.pc.pulse_width, 0, group=group)
     yield from bps.abs_set(zebra.pc.pulse_step, 0, group=group)
-    yield from bps.wait(group=group)
+    if wait:
+        yield from bps.wait(group=group)
 
 
-def reset_output_panel(zebra: Zebra, group: str = "reset_zebra_outputs"):
+def reset_output_panel(
+    zebra: Zebra, group: str = "reset_zebra_outputs", wait: bool = True
+):
     # Reset TTL out
     yield from bps.abs_set(zebra.output.out_pvs[2], PC_GATE, group=group)
     yield from bps.abs_set(zebra.output.out_pvs[3], DISCONNECT, group=group)
@@ -402,7 +455,8 @@ def reset_output_panel(zebra: Zebra, group: str = "reset_zebra_outputs"):
     yield from bps.abs_set(zebra.output.pulse_1.input, DISCONNECT, group=group)
     yield from bps.abs_set(zebra.output.pulse_2.input, DISCONNECT, group=group)
 
-    yield from bps.wait(group=group)
+    if wait:
+        yield from bps.wait(group=group)
 
 
 def zebra_return_to_normal_plan(
@@ -412,10 +466,13 @@ def zebra_return_to_normal_plan(
 
     This plan should only be run after disarming the Zebra.
     """
-    yield from bps.abs_set(zebra.pc.reset, 1, group=group)
+    # Reset the position compare before changing any of the other settings
+    yield from bps.abs_set(zebra.pc.reset, 1, wait=True)
 
     # Reset PC_GATE and PC_SOURCE to "Position"
-    yield from setup_pc_sources(zebra, TrigSource.POSITION, TrigSource.POSITION)
+    yield from setup_pc_sources(
+        zebra, TrigSource.POSITION, TrigSource.POSITION, group=group, wait=False
+    )
 
     yield from bps.abs_set(zebra.pc.gate_input, SOFT_IN3, group=group)
     yield from bps.abs_set(zebra.pc.num_gates, 1, group=group)
@@ -430,14 +487,13 @@ def zebra_return_to_normal_plan(
     )
 
     # Reset TTL out
-    yield from reset_output_panel(zebra)
+    yield from reset_output_panel(zebra, group=group, wait=False)
 
     # Reset Pos Trigger and direction to rotation axis ("omega") and positive
     yield from bps.abs_set(zebra.pc.gate_trigger, I24Axes.OMEGA.value, group=group)
     yield from bps.abs_set(zebra.pc.dir, RotationDirection.POSITIVE, group=group)
 
-    #
-    yield from reset_pc_gate_and_pulse(zebra)
+    yield from reset_pc_gate_and_pulse(zebra, group=group, wait=False)
 
     if wait:
         yield from bps.wait(group)
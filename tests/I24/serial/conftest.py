@@ -1,56 +1,90 @@
 from __future__ import annotations
 
-from unittest.mock import AsyncMock
+from contextlib import ExitStack
+from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 from bluesky.run_engine import RunEngine
 from dodal.beamlines import i24
 from dodal.devices.i24.pmac import PMAC
-from dodal.devices.zebra import Zebra
-from ophyd_async.core import callback_on_mock_put, set_mock_value
+from dodal.devices.zebra import SoftInState, Zebra
+from ophyd_async.core import callback_on_mock_put, get_mock_put, set_mock_value
 from ophyd_async.epics.motion import Motor
 
 
-def patch_motor(motor: Motor, initial_position: float = 0):
+def patch_motor(stack: ExitStack, motor: Motor, initial_position: float = 0):
     set_mock_value(motor.user_setpoint, initial_position)
     set_mock_value(motor.user_readback, initial_position)
     set_mock_value(motor.deadband, 0.001)
     set_mock_value(motor.motor_done_move, 1)
     set_mock_value(motor.velocity, 3)
-    return callback_on_mock_put(
-        motor.user_setpoint,
-        lambda pos, *args, **kwargs: set_mock_value(motor.user_readback, pos),
+    stack.enter_context(
+        callback_on_mock_put(
+            motor.user_setpoint,
+            lambda pos, *args, **kwargs: set_mock_value(motor.user_readback, pos),
+        )
     )
 
 
-@pytest.fixture
-def zebra() -> Zebra:
-    RunEngine()
-    zebra = i24.zebra(fake_with_ophyd_sim=True)
+@pytest.fixture(scope="session")
+def RE():
+    return RunEngine()
+
+
+def install_arm_mocks(zebra: Zebra):
+    """Make the arm and disarm demands update the zebra armed state."""
+
+    def put_armed(value: int):
+        async def _put(_):
+            await zebra.pc.arm.armed._backend.put(value)  # type: ignore
+
+        return _put
 
-    async def mock_disarm(_):
-        await zebra.pc.arm.armed._backend.put(0)  # type: ignore
+    zebra.pc.arm.arm_set.set = AsyncMock(side_effect=put_armed(1))
+    zebra.pc.arm.disarm_set.set = AsyncMock(side_effect=put_armed(0))
 
-    async def mock_arm(_):
-        await zebra.pc.arm.armed._backend.put(1)  # type: ignore
 
-    zebra.pc.arm.arm_set.set = AsyncMock(side_effect=mock_arm)
-    zebra.pc.arm.disarm_set.set = AsyncMock(side_effect=mock_disarm)
+@pytest.fixture(scope="session")
+def _zebra(RE) -> Zebra:
+    zebra = i24.zebra(fake_with_ophyd_sim=True)
+    install_arm_mocks(zebra)
     return zebra
 
 
 @pytest.fixture
-def pmac():
-    RunEngine()
-    pmac: PMAC = i24.pmac(fake_with_ophyd_sim=True)
-    with (
-        patch_motor(pmac.x),
-        patch_motor(pmac.y),
-        patch_motor(pmac.z),
-    ):
-        yield pmac
+def zebra(_zebra: Zebra) -> Zebra:
+    # The device is only built once, so reset what the tests rely on
+    set_mock_value(_zebra.pc.arm.armed, 0)
+    set_mock_value(_zebra.inputs.soft_in_1, SoftInState.NO)
+    set_mock_value(_zebra.inputs.soft_in_2, SoftInState.NO)
+    _zebra.pc.arm.arm_set.set.reset_mock()  # type: ignore
+    _zebra.pc.arm.disarm_set.set.reset_mock()  # type: ignore
+    return _zebra
+
+
+@pytest.fixture(scope="session")
+def _pmac(RE) -> PMAC:
+    return i24.pmac(fake_with_ophyd_sim=True)
 
 
 @pytest.fixture
-def RE():
-    return RunEngine()
+def pmac(_pmac: PMAC):
+    # The device is only built once, so clear the puts made by earlier tests
+    set_mock_value(_pmac.pmac_string, "")
+    get_mock_put(_pmac.pmac_string).reset_mock()
+    with ExitStack() as stack:
+        for motor in (_pmac.x, _pmac.y, _pmac.z):
+            for signal in (
+                motor.velocity,
+                motor.acceleration_time,
+                motor.high_limit_travel,
+                motor.low_limit_travel,
+            ):
+                get_mock_put(signal).reset_mock()
+            patch_motor(stack, motor)
+        yield _pmac
+
+
+@pytest.fixture
+def mock_pmac_str(pmac: PMAC) -> MagicMock:
+    return get_mock_put(pmac.pmac_string)
@@ -1,3 +1,5 @@
+from pathlib import Path
+
 import pytest
 
 from mx_bluesky.I24.serial.parameters import FixedTargetParameters
@@ -19,3 +21,33 @@ def dummy_params_without_pp():
         "checker_pattern": False,
     }
     return FixedTargetParameters(**params)
+
+
+@pytest.fixture(scope="session")
+def mtr_dir_data() -> str:
+    return """#Some words
+mtr1_dir=1
+mtr2_dir=-1
+mtr3_dir=-1"""
+
+
+@pytest.fixture(scope="session")
+def fiducial_1_data() -> str:
+    return """MTR RBV Corr
+MTR1 0 1
+MTR2 1 -1
+MTR3 0 -1"""
+
+
+@pytest.fixture(scope="session")
+def cs_json_data() -> str:
+    return '{"scalex":1, "scaley":2, "scalez":3, "skew":-0.5, "Sx_dir":1, "Sy_dir":-1, "Sz_dir":0}'
+
+
+@pytest.fixture(scope="session")
+def chip_files(tmp_path_factory, mtr_dir_data: str, fiducial_1_data: str) -> Path:
+    """Directory with the motor direction and fiducial files the chip manager reads."""
+    files_path = tmp_path_factory.mktemp("chip_files")
+    (files_path / "motor_direction.txt").write_text(mtr_dir_data)
+    (files_path / "fiducial_1.txt").write_text(fiducial_1_data)
+    return files_path
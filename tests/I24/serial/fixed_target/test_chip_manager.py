@@ -1,138 +1,315 @@
+import asyncio
 import json
+import os
+import time
+from pathlib import Path
+from types import SimpleNamespace
 from typing import List
-from unittest.mock import ANY, MagicMock, call, mock_open, patch
+from unittest.mock import ANY, MagicMock, call, create_autospec
 
 import pytest
 from dodal.devices.i24.pmac import PMAC
-from ophyd_async.core import get_mock_put
+from ophyd_async.core import set_mock_value
 
 from mx_bluesky.I24.serial.fixed_target.ft_utils import Fiducials
 from mx_bluesky.I24.serial.fixed_target.i24ssx_Chip_Manager_py3v1 import (
+    OXFORD_BLOCK_DICT,
+    _read_mtr_directions,
+    block_check,
     cs_maker,
     cs_reset,
+    fiducial,
     initialise_stages,
     laser_control,
+    load_lite_map,
+    load_stock_map,
     moveto,
     moveto_preset,
     pumpprobe_calc,
+    save_screen_map,
     scrape_mtr_directions,
     scrape_mtr_fiducials,
+    scrape_pvar_file,
     set_pmac_strings_for_cs,
+    setup_logging,
+    upload_full,
+    upload_parameters,
 )
-from mx_bluesky.I24.serial.setup_beamline import Eiger
+from mx_bluesky.I24.serial.setup_beamline import (
+    Eiger,
+    caget,
+    caget_many,
+    caput,
+    caput_many,
+)
+from mx_bluesky.I24.serial.setup_beamline.setup_detector import get_detector_type
+
+CHIP_MANAGER = "mx_bluesky.I24.serial.fixed_target.i24ssx_Chip_Manager_py3v1"
+
+
+@pytest.fixture
+def chip_manager_mocks(monkeypatch) -> SimpleNamespace:
+    """Patch out the EPICS access, sleeps and logging setup used by most plans."""
+    mocks = SimpleNamespace(
+        caput=create_autospec(caput),
+        caput_many=create_autospec(caput_many),
+        caget=create_autospec(caget),
+        caget_many=create_autospec(caget_many),
+        get_detector_type=create_autospec(get_detector_type),
+        sleep=create_autospec(time.sleep),
+        setup_logging=create_autospec(setup_logging),
+    )
+    for name, mock in vars(mocks).items():
+        monkeypatch.setattr(f"{CHIP_MANAGER}.{name}", mock)
+    return mocks
+
 
-mtr_dir_str = """#Some words
-mtr1_dir=1
-mtr2_dir=-1
-mtr3_dir=-1"""
+@pytest.fixture
+def write_cs_maker_json(monkeypatch, tmp_path):
+    """Point cs_maker at a cs_maker.json with the given contents."""
+    monkeypatch.setattr(f"{CHIP_MANAGER}.CS_FILES_PATH", tmp_path)
 
-fiducial_1_str = """MTR RBV Corr
-MTR1 0 1
-MTR2 1 -1
-MTR3 0 -1"""
+    def _write_cs_maker_json(contents: str):
+        (tmp_path / "cs_maker.json").write_text(contents)
 
-cs_json = '{"scalex":1, "scaley":2, "scalez":3, "skew":-0.5, "Sx_dir":1, "Sy_dir":-1, "Sz_dir":0}'
+    return _write_cs_maker_json
+
+
+@pytest.fixture
+def patched_scrapers(monkeypatch):
+    """Give cs_maker unit motor directions and fiducials at the origin."""
+    monkeypatch.setattr(
+        f"{CHIP_MANAGER}.scrape_mtr_directions", MagicMock(return_value=(1, 1, 1))
+    )
+    monkeypatch.setattr(
+        f"{CHIP_MANAGER}.scrape_mtr_fiducials", MagicMock(return_value=(0, 0, 0))
+    )
 
 
-@patch("mx_bluesky.I24.serial.fixed_target.i24ssx_Chip_Manager_py3v1.setup_logging")
-@patch("mx_bluesky.I24.serial.fixed_target.i24ssx_Chip_Manager_py3v1.sys")
-@patch("mx_bluesky.I24.serial.fixed_target.i24ssx_Chip_Manager_py3v1.get_detector_type")
-@patch("mx_bluesky.I24.serial.fixed_target.i24ssx_Chip_Manager_py3v1.caput")
 async def test_initialise(
-    fake_caput: MagicMock,
-    fake_det: MagicMock,
-    fake_sys: MagicMock,
-    fake_log: MagicMock,
+    chip_manager_mocks: SimpleNamespace,
+    monkeypatch,
     pmac: PMAC,
+    mock_pmac_str: MagicMock,
     RE,
 ):
-    fake_det.return_value = Eiger()
+    monkeypatch.setattr(f"{CHIP_MANAGER}.sys", MagicMock())
+    chip_manager_mocks.get_detector_type.return_value = Eiger()
     RE(initialise_stages(pmac))
 
-    fake_caput.assert_called_with(ANY, "eiger")  # last call should be detector
-
-    assert await pmac.x.velocity.get_value() == 20
-    assert await pmac.y.acceleration_time.get_value() == 0.01
-    assert await pmac.z.high_limit_travel.get_value() == 5.1
-    assert await pmac.z.low_limit_travel.get_value() == -4.1
+    # last call should be detector
+    chip_manager_mocks.caput.assert_called_with(ANY, "eiger")
+    chip_manager_mocks.caput_many.assert_called_once_with(
+        [f"ME14E-MO-IOC-01:GP{i}" for i in range(4, 120)], [0] * 116
+    )
 
-    mock_pmac_str = get_mock_put(pmac.pmac_string)
-    mock_pmac_str.assert_has_calls(
-        [
-            call("m508=100 m509=150", wait=True, timeout=10.0),
-            call("m608=100 m609=150", wait=True, timeout=10.0),
-            call("m708=100 m709=150", wait=True, timeout=10.0),
-            call("m808=100 m809=150", wait=True, timeout=10.0),
-        ]
+    assert await asyncio.gather(
+        pmac.x.velocity.get_value(),
+        pmac.y.acceleration_time.get_value(),
+        pmac.z.high_limit_travel.get_value(),
+        pmac.z.low_limit_travel.get_value(),
+    ) == [20, 0.01, 5.1, -4.1]
+
+    expected_calls = [
+        call(f"m{axis}08=100 m{axis}09=150", wait=True, timeout=10.0)
+        for axis in (5, 6, 7, 8)
+    ]
+    assert [
+        c for c in mock_pmac_str.call_args_list if c in expected_calls
+    ] == expected_calls
+
+
+def test_load_stock_map(RE, chip_manager_mocks: SimpleNamespace):
+    RE(load_stock_map("h33"))
+    chip_manager_mocks.caput_many.assert_called_once()
+    block_pvs, values = chip_manager_mocks.caput_many.call_args.args
+    assert len(block_pvs) == len(values) == 64
+    assert block_pvs[0] == "ME14E-MO-IOC-01:GP11"
+    assert values[:9] == [1] * 9
+    assert sum(values) == 9
+
+
+def test_load_stock_map_sets_blocks_above_64(RE, chip_manager_mocks: SimpleNamespace):
+    RE(load_stock_map("x99"))
+    block_pvs, values = chip_manager_mocks.caput_many.call_args.args
+    assert len(block_pvs) == len(values) == 81
+    assert block_pvs[-1] == "ME14E-MO-IOC-01:GP91"
+    assert values == [1] * 81
+
+
+def test_scrape_pvar_file():
+    res = scrape_pvar_file("oxford.pvar")
+    assert len(res) == 64
+    assert res[0] == ["01", "0.000", "0.000"]
+    assert res[9] == ["10", "3.175", "21.425"]
+
+
+def test_scrape_pvar_file_only_reads_the_file_again_if_modified(tmp_path, monkeypatch):
+    pvar_file = tmp_path / "test.pvar"
+    pvar_file.write_text("P3011=0.000 P3012=0.000\n")
+    assert scrape_pvar_file("test.pvar", tmp_path) == [["01", "0.000", "0.000"]]
+
+    with monkeypatch.context() as m:
+        fake_open = MagicMock()
+        m.setattr(f"{CHIP_MANAGER}.open", fake_open, raising=False)
+        assert scrape_pvar_file("test.pvar", tmp_path) == [["01", "0.000", "0.000"]]
+        fake_open.assert_not_called()
+
+    pvar_file.write_text("P3021=3.175 P3022=0.000\n")
+    os.utime(pvar_file, ns=(0, pvar_file.stat().st_mtime_ns + 1000))
+    assert scrape_pvar_file("test.pvar", tmp_path) == [["02", "3.175", "0.000"]]
+
+
+def test_oxford_block_dict_is_in_snake_order():
+    assert len(OXFORD_BLOCK_DICT) == 72
+    assert [OXFORD_BLOCK_DICT[f"{row}1"] for row in "AH"] == ["01", "08"]
+    assert [OXFORD_BLOCK_DICT[f"{row}2"] for row in "AH"] == ["16", "09"]
+
+
+def test_load_lite_map(tmp_path, RE, chip_manager_mocks: SimpleNamespace):
+    chip_manager_mocks.caget.side_effect = [0, "test"]
+    (tmp_path / "test.lite").write_text("A1 1\nB1 0\nA2 1\n")
+    RE(load_lite_map(tmp_path.as_posix()))
+    chip_manager_mocks.caput_many.assert_called_with(
+        ["ME14E-MO-IOC-01:GP11", "ME14E-MO-IOC-01:GP12", "ME14E-MO-IOC-01:GP26"],
+        ["1", "0", "1"],
     )
 
 
-@patch("mx_bluesky.I24.serial.fixed_target.i24ssx_Chip_Manager_py3v1.setup_logging")
-@patch("mx_bluesky.I24.serial.fixed_target.i24ssx_Chip_Manager_py3v1.caget")
-async def test_moveto_oxford_origin(
-    fake_caget: MagicMock, fake_log: MagicMock, pmac: PMAC, RE
-):
-    fake_caget.return_value = 0
-    RE(moveto(Fiducials.origin, pmac))
-    assert fake_caget.call_count == 1
-    assert await pmac.x.user_readback.get_value() == 0.0
-    assert await pmac.y.user_readback.get_value() == 0.0
+def test_save_screen_map(tmp_path, RE, chip_manager_mocks: SimpleNamespace):
+    chip_manager_mocks.caget_many.return_value = ["1", "0"] + ["0"] * 79
+    RE(save_screen_map(tmp_path.as_posix()))
+    chip_manager_mocks.caget_many.assert_called_once()
+    lines = (tmp_path / "currentchip.map").read_text().splitlines()
+    assert len(lines) == 81
+    assert lines[0] == "01status    P3011 \t1"
+    assert lines[1] == "02status    P3021 \t0"
 
 
-@patch("mx_bluesky.I24.serial.fixed_target.i24ssx_Chip_Manager_py3v1.setup_logging")
-@patch("mx_bluesky.I24.serial.fixed_target.i24ssx_Chip_Manager_py3v1.caget")
-async def test_moveto_oxford_inner_f1(
-    fake_caget: MagicMock, fake_log: MagicMock, pmac: PMAC, RE
+def test_upload_parameters_groups_block_settings(
+    pmac: PMAC,
+    mock_pmac_str: MagicMock,
+    tmp_path,
+    RE,
+    chip_manager_mocks: SimpleNamespace,
 ):
-    fake_caget.return_value = 1
-    RE(moveto(Fiducials.fid1, pmac))
-    assert fake_caget.call_count == 1
-    assert await pmac.x.user_readback.get_value() == 24.60
-    assert await pmac.y.user_readback.get_value() == 0.0
+    (tmp_path / "currentchip.map").write_text(
+        "".join(f"{x:02d}status    P3{x:02d}1 \t{x % 2}\n" for x in range(1, 82))
+    )
+    RE(upload_parameters("oxford", tmp_path.as_posix(), pmac))
+
+    assert mock_pmac_str.call_count == 16
+    expected_calls = [
+        call("P3011=1 P3021=0 P3031=1 P3041=0", wait=True, timeout=10.0),
+        call("P3051=1 P3061=0 P3071=1 P3081=0", wait=True, timeout=10.0),
+    ]
+    assert [
+        c for c in mock_pmac_str.call_args_list if c in expected_calls
+    ] == expected_calls
+    for pmac_call in mock_pmac_str.call_args_list:
+        assert len(pmac_call.args[0]) < 40
+    assert chip_manager_mocks.sleep.call_count == 16
+
+
+def test_upload_full(pmac: PMAC, mock_pmac_str: MagicMock, tmp_path, RE, monkeypatch):
+    monkeypatch.setattr(f"{CHIP_MANAGER}.bps.sleep", MagicMock())
+    (tmp_path / "currentchip.full").write_text(
+        "P5001=$0000001\nP5002=$0000002\nP5003=$0000003\nP5004=$0000004\nP5005=$5\n"
+    )
+    RE(upload_full(pmac, tmp_path))
 
+    assert mock_pmac_str.call_args_list == [
+        call("P5001=$0000001 P5002=$0000002", wait=True, timeout=10.0),
+        call("P5003=$0000003 P5004=$0000004", wait=True, timeout=10.0),
+    ]
 
-@patch("mx_bluesky.I24.serial.fixed_target.i24ssx_Chip_Manager_py3v1.setup_logging")
-async def test_moveto_chip_aspecific(fake_log: MagicMock, pmac: PMAC, RE):
-    RE(moveto("zero", pmac))
-    assert await pmac.pmac_string.get_value() == "!x0y0z0"
+
+@pytest.mark.parametrize(
+    "chip_type, fiducial_point, expected_x",
+    [(0, Fiducials.origin, 0.0), (1, Fiducials.fid1, 24.60)],
+)
+async def test_moveto_oxford_fiducial(
+    chip_type: int,
+    fiducial_point: Fiducials,
+    expected_x: float,
+    pmac: PMAC,
+    RE,
+    chip_manager_mocks: SimpleNamespace,
+):
+    chip_manager_mocks.caget.return_value = chip_type
+    RE(moveto(fiducial_point, pmac))
+    assert chip_manager_mocks.caget.call_count == 1
+    assert await pmac.x.user_readback.get_value() == expected_x
+    assert await pmac.y.user_readback.get_value() == 0.0
 
 
-@patch("mx_bluesky.I24.serial.fixed_target.i24ssx_Chip_Manager_py3v1.setup_logging")
-@patch("mx_bluesky.I24.serial.fixed_target.i24ssx_Chip_Manager_py3v1.caput")
-async def test_moveto_preset(
-    fake_caput: MagicMock, fake_log: MagicMock, pmac: PMAC, RE
+async def test_moveto_chip_aspecific(
+    pmac: PMAC, RE, chip_manager_mocks: SimpleNamespace
 ):
-    RE(moveto_preset("zero", pmac))
+    RE(moveto("zero", pmac))
     assert await pmac.pmac_string.get_value() == "!x0y0z0"
 
-    RE(moveto_preset("load_position", pmac))
-    assert fake_caput.call_count == 3
-
 
 @pytest.mark.parametrize(
-    "pos_request, expected_num_caput, expected_pmac_move",
+    "pos_request, expected_num_caput, expected_caput_many, expected_pmac_string, "
+    "expected_pmac_move",
     [
-        ("collect_position", 3, [0.0, 0.0, 0.0]),
-        ("microdrop_position", 0, [6.0, -7.8, 0.0]),
+        ("zero", 0, [], "!x0y0z0", [0.0, 0.0, 0.0]),
+        (
+            "load_position",
+            0,
+            [
+                call(
+                    [
+                        "BL24I-MO-BS-01:MP:SELECT",
+                        "BL24I-MO-BL-01:MP:SELECT",
+                        "BL24I-EA-DET-01:Z",
+                    ],
+                    ["Robot", "Out", 1300],
+                )
+            ],
+            None,
+            [0.0, 0.0, 0.0],
+        ),
+        (
+            "collect_position",
+            1,
+            [
+                call(
+                    ["BL24I-MO-BS-01:MP:SELECT", "BL24I-MO-BL-01:MP:SELECT"],
+                    ["Data Collection", "In"],
+                )
+            ],
+            None,
+            [0.0, 0.0, 0.0],
+        ),
+        ("microdrop_position", 0, [], None, [6.0, -7.8, 0.0]),
     ],
 )
-@patch("mx_bluesky.I24.serial.fixed_target.i24ssx_Chip_Manager_py3v1.setup_logging")
-@patch("mx_bluesky.I24.serial.fixed_target.i24ssx_Chip_Manager_py3v1.caput")
-async def test_moveto_preset_with_pmac_move(
-    fake_caput: MagicMock,
-    fake_log: MagicMock,
+async def test_moveto_preset(
     pos_request: str,
     expected_num_caput: int,
+    expected_caput_many: List,
+    expected_pmac_string: str | None,
     expected_pmac_move: List,
     pmac: PMAC,
     RE,
+    chip_manager_mocks: SimpleNamespace,
 ):
     RE(moveto_preset(pos_request, pmac))
-    assert fake_caput.call_count == expected_num_caput
-
-    assert await pmac.x.user_readback.get_value() == expected_pmac_move[0]
-    assert await pmac.y.user_readback.get_value() == expected_pmac_move[1]
-    assert await pmac.z.user_readback.get_value() == expected_pmac_move[2]
+    assert chip_manager_mocks.caput.call_count == expected_num_caput
+    assert chip_manager_mocks.caput_many.call_args_list == expected_caput_many
+    if expected_pmac_string is not None:
+        assert await pmac.pmac_string.get_value() == expected_pmac_string
+
+    assert (
+        await asyncio.gather(
+            pmac.x.user_readback.get_value(),
+            pmac.y.user_readback.get_value(),
+            pmac.z.user_readback.get_value(),
+        )
+        == expected_pmac_move
+    )
 
 
 @pytest.mark.parametrize(
@@ -144,55 +321,91 @@ async def test_moveto_preset_with_pmac_move(
         ("laser2off", " M812=0 M811=1"),
     ],
 )
-@patch("mx_bluesky.I24.serial.fixed_target.i24ssx_Chip_Manager_py3v1.setup_logging")
 async def test_laser_control_on_and_off(
-    fake_log: MagicMock, laser_setting: str, expected_pmac_string: str, pmac: PMAC, RE
+    laser_setting: str,
+    expected_pmac_string: str,
+    pmac: PMAC,
+    RE,
+    chip_manager_mocks: SimpleNamespace,
 ):
     RE(laser_control(laser_setting, pmac))
 
     assert await pmac.pmac_string.get_value() == expected_pmac_string
 
 
-@patch("mx_bluesky.I24.serial.fixed_target.i24ssx_Chip_Manager_py3v1.setup_logging")
-@patch("mx_bluesky.I24.serial.fixed_target.i24ssx_Chip_Manager_py3v1.caget")
-@patch("mx_bluesky.I24.serial.fixed_target.i24ssx_Chip_Manager_py3v1.bps.sleep")
 def test_laser_control_burn_setting(
-    fake_sleep: MagicMock, fake_caget: MagicMock, fake_log: MagicMock, pmac: PMAC, RE
+    pmac: PMAC,
+    mock_pmac_str: MagicMock,
+    RE,
+    chip_manager_mocks: SimpleNamespace,
+    monkeypatch,
 ):
-    fake_caget.return_value = 0.1
+    fake_sleep = MagicMock()
+    monkeypatch.setattr(f"{CHIP_MANAGER}.bps.sleep", fake_sleep)
+    chip_manager_mocks.caget.return_value = "0.1"
     RE(laser_control("laser1burn", pmac))
 
     fake_sleep.assert_called_once_with(0.1)
-    mock_pmac_str = get_mock_put(pmac.pmac_string)
-    mock_pmac_str.assert_has_calls(
-        [
-            call(" M712=1 M711=1", wait=True, timeout=10.0),
-            call(" M712=0 M711=1", wait=True, timeout=10.0),
-        ]
-    )
+    expected_calls = [
+        call(" M712=1 M711=1", wait=True, timeout=10.0),
+        call(" M712=0 M711=1", wait=True, timeout=10.0),
+    ]
+    assert [
+        c for c in mock_pmac_str.call_args_list if c in expected_calls
+    ] == expected_calls
 
 
-@patch(
-    "mx_bluesky.I24.serial.fixed_target.i24ssx_Chip_Manager_py3v1.open",
-    mock_open(read_data=mtr_dir_str),
-)
-def test_scrape_mtr_directions():
-    res = scrape_mtr_directions()
+def test_scrape_mtr_directions(chip_files: Path):
+    res = scrape_mtr_directions(chip_files)
     assert len(res) == 3
     assert res == (1.0, -1.0, -1.0)
 
 
-@patch(
-    "mx_bluesky.I24.serial.fixed_target.i24ssx_Chip_Manager_py3v1.open",
-    mock_open(read_data=fiducial_1_str),
-)
-def test_scrape_mtr_fiducials():
-    res = scrape_mtr_fiducials(1)
+def test_scrape_mtr_directions_only_reads_the_file_again_if_modified(
+    mtr_dir_data: str, tmp_path, monkeypatch
+):
+    _read_mtr_directions.cache_clear()
+    motor_file = tmp_path / "motor_direction.txt"
+    motor_file.write_text(mtr_dir_data)
+    assert scrape_mtr_directions(tmp_path) == (1.0, -1.0, -1.0)
+
+    with monkeypatch.context() as m:
+        fake_open = MagicMock()
+        m.setattr(f"{CHIP_MANAGER}.open", fake_open, raising=False)
+        assert scrape_mtr_directions(tmp_path) == (1.0, -1.0, -1.0)
+        fake_open.assert_not_called()
+
+    motor_file.write_text("mtr1_dir=-1\nmtr2_dir=1\nmtr3_dir=1")
+    os.utime(motor_file, ns=(0, motor_file.stat().st_mtime_ns + 1000))
+    assert scrape_mtr_directions(tmp_path) == (-1.0, 1.0, 1.0)
+
+
+def test_scrape_mtr_fiducials(chip_files: Path):
+    res = scrape_mtr_fiducials(1, chip_files)
     assert len(res) == 3
     assert res == (0.0, 1.0, 0.0)
 
 
-def test_cs_pmac_str_set(pmac: PMAC, RE):
+def test_fiducial_writes_positions_to_file(
+    pmac: PMAC, RE, tmp_path, chip_manager_mocks: SimpleNamespace, monkeypatch
+):
+    monkeypatch.setattr(
+        f"{CHIP_MANAGER}.scrape_mtr_directions",
+        MagicMock(return_value=(1.0, -1.0, -1.0)),
+    )
+    monkeypatch.setattr(f"{CHIP_MANAGER}.PARAM_FILE_PATH_FT", tmp_path)
+    set_mock_value(pmac.x.user_readback, 0.1)
+    set_mock_value(pmac.y.user_readback, 0.2)
+    set_mock_value(pmac.z.user_readback, 0.3)
+    RE(fiducial(1, pmac))
+
+    assert (tmp_path / "fiducial_1.txt").read_text() == (
+        "MTR\tRBV\tCorr\nMTR1\t0.1000\t1\nMTR2\t0.2000\t-1\nMTR3\t0.3000\t-1"
+    )
+    assert scrape_mtr_fiducials(1, tmp_path) == (0.1, 0.2, 0.3)
+
+
+def test_cs_pmac_str_set(pmac: PMAC, mock_pmac_str: MagicMock, RE):
     RE(
         set_pmac_strings_for_cs(
             pmac,
@@ -203,120 +416,159 @@ def test_cs_pmac_str_set(pmac: PMAC, RE):
             },
         )
     )
-    mock_pmac_str = get_mock_put(pmac.pmac_string)
-    mock_pmac_str.assert_has_calls(
-        [
-            call("&2", wait=True, timeout=10.0),
-            call("#1->-10000X+0Y+0Z", wait=True, timeout=10.0),
-            call("#2->+0X+10000Y+0Z", wait=True, timeout=10.0),
-            call("#3->0X+0Y+10000Z", wait=True, timeout=10.0),
-        ]
-    )
+    expected_calls = [
+        call(pmac_str, wait=True, timeout=10.0)
+        for pmac_str in (
+            "&2",
+            "#1->-10000X+0Y+0Z",
+            "#2->+0X+10000Y+0Z",
+            "#3->0X+0Y+10000Z",
+        )
+    ]
+    assert [
+        c for c in mock_pmac_str.call_args_list if c in expected_calls
+    ] == expected_calls
 
 
-@patch("mx_bluesky.I24.serial.fixed_target.i24ssx_Chip_Manager_py3v1.setup_logging")
-@patch(
-    "mx_bluesky.I24.serial.fixed_target.i24ssx_Chip_Manager_py3v1.set_pmac_strings_for_cs"
-)
-def test_cs_reset(mock_set_pmac_str: MagicMock, fake_log: MagicMock, pmac: PMAC, RE):
+def test_cs_reset(pmac: PMAC, RE, chip_manager_mocks: SimpleNamespace, monkeypatch):
+    mock_set_pmac_str = MagicMock()
+    monkeypatch.setattr(f"{CHIP_MANAGER}.set_pmac_strings_for_cs", mock_set_pmac_str)
     RE(cs_reset(pmac))
     mock_set_pmac_str.assert_called_once()
 
 
-@patch(
-    "mx_bluesky.I24.serial.fixed_target.i24ssx_Chip_Manager_py3v1.open",
-    mock_open(read_data='{"a":11, "b":12,}'),
-)
-@patch("mx_bluesky.I24.serial.fixed_target.i24ssx_Chip_Manager_py3v1.caget")
-@patch(
-    "mx_bluesky.I24.serial.fixed_target.i24ssx_Chip_Manager_py3v1.scrape_mtr_directions"
-)
-@patch(
-    "mx_bluesky.I24.serial.fixed_target.i24ssx_Chip_Manager_py3v1.scrape_mtr_fiducials"
+@pytest.mark.parametrize(
+    "read_data, expected_error",
+    [
+        ('{"a":11, "b":12,}', json.JSONDecodeError),
+        ('{"scalex":11, "skew":12}', KeyError),
+        (
+            '{"scalex":1, "scaley":2, "scalez":3, "skew":-0.5, "Sx_dir":1, "Sy_dir":-1, "Sz_dir":0}',
+            ValueError,
+        ),
+    ],
+    ids=["invalid_json", "missing_key", "wrong_direction"],
 )
-@patch("mx_bluesky.I24.serial.fixed_target.i24ssx_Chip_Manager_py3v1.setup_logging")
-def test_cs_maker_raises_error_for_invalid_json(
-    fake_log: MagicMock,
-    fake_fid: MagicMock,
-    fake_dir: MagicMock,
-    fake_caget: MagicMock,
+def test_cs_maker_raises_error_for_bad_json(
+    read_data: str,
+    expected_error: type[Exception],
+    chip_manager_mocks: SimpleNamespace,
+    patched_scrapers,
+    write_cs_maker_json,
     pmac: PMAC,
     RE,
 ):
-    fake_dir.return_value = (1, 1, 1)
-    fake_fid.return_value = (0, 0, 0)
-    with pytest.raises(json.JSONDecodeError):
+    write_cs_maker_json(read_data)
+    with pytest.raises(expected_error):
         RE(cs_maker(pmac))
 
 
-@patch(
-    "mx_bluesky.I24.serial.fixed_target.i24ssx_Chip_Manager_py3v1.open",
-    mock_open(read_data='{"scalex":11, "skew":12}'),
-)
-@patch("mx_bluesky.I24.serial.fixed_target.i24ssx_Chip_Manager_py3v1.caget")
-@patch(
-    "mx_bluesky.I24.serial.fixed_target.i24ssx_Chip_Manager_py3v1.scrape_mtr_directions"
-)
-@patch(
-    "mx_bluesky.I24.serial.fixed_target.i24ssx_Chip_Manager_py3v1.scrape_mtr_fiducials"
-)
-@patch("mx_bluesky.I24.serial.fixed_target.i24ssx_Chip_Manager_py3v1.setup_logging")
-def test_cs_maker_raises_error_for_missing_key_in_json(
-    fake_log: MagicMock,
-    fake_fid: MagicMock,
-    fake_dir: MagicMock,
-    fake_caget: MagicMock,
+def test_cs_maker_sets_coordinate_system_from_fiducials(
+    cs_json_data: str,
+    chip_manager_mocks: SimpleNamespace,
+    write_cs_maker_json,
+    monkeypatch,
     pmac: PMAC,
     RE,
 ):
-    fake_dir.return_value = (1, 1, 1)
-    fake_fid.return_value = (0, 0, 0)
-    with pytest.raises(KeyError):
-        RE(cs_maker(pmac))
+    mock_set_pmac_str = MagicMock()
+    fake_sleep = MagicMock()
+    monkeypatch.setattr(f"{CHIP_MANAGER}.set_pmac_strings_for_cs", mock_set_pmac_str)
+    monkeypatch.setattr(f"{CHIP_MANAGER}.bps.sleep", fake_sleep)
+    monkeypatch.setattr(
+        f"{CHIP_MANAGER}.scrape_mtr_directions", MagicMock(return_value=(1, -1, -1))
+    )
+    monkeypatch.setattr(
+        f"{CHIP_MANAGER}.scrape_mtr_fiducials",
+        MagicMock(side_effect=[(0.0, 0.1, 0.02), (0.15, 0.0, -0.03)]),
+    )
+    write_cs_maker_json(cs_json_data.replace('"Sz_dir":0', '"Sz_dir":1'))
+    chip_manager_mocks.caget.return_value = "0"
+    RE(cs_maker(pmac))
+
+    mock_set_pmac_str.assert_called_once_with(
+        pmac,
+        {
+            "cs1": "#1->+1.000X-0.002Y+0.002Z",
+            "cs2": "#2->+0.010X-2.000Y-0.004Z",
+            "cs3": "#3->+0.001X+0.002Y-3.000Z",
+        },
+    )
+    assert fake_sleep.call_args_list == [call(2.5), call(0.1), call(0.1), call(0.1)]
 
 
-@patch(
-    "mx_bluesky.I24.serial.fixed_target.i24ssx_Chip_Manager_py3v1.open",
-    mock_open(read_data=cs_json),
-)
-@patch("mx_bluesky.I24.serial.fixed_target.i24ssx_Chip_Manager_py3v1.caget")
-@patch(
-    "mx_bluesky.I24.serial.fixed_target.i24ssx_Chip_Manager_py3v1.scrape_mtr_directions"
-)
-@patch(
-    "mx_bluesky.I24.serial.fixed_target.i24ssx_Chip_Manager_py3v1.scrape_mtr_fiducials"
+def test_pumpprobe_calc(RE, chip_manager_mocks: SimpleNamespace):
+    chip_manager_mocks.caget.side_effect = [0.01, 0.005]
+    RE(pumpprobe_calc())
+    assert chip_manager_mocks.caget.call_count == 2
+    chip_manager_mocks.caput_many.assert_called_once_with(
+        [f"ME14E-MO-IOC-01:GP{i}" for i in range(104, 109)],
+        [0.62, 1.24, 1.86, 3.1, 6.2],
+    )
+
+
+@pytest.mark.parametrize(
+    "abort_flags, expected_moves",
+    [
+        (["0", "0", "0"], ["!x0.000y0.000", "!x3.175y0.000", "!x6.350y0.000"]),
+        (["0", "1"], ["!x0.000y0.000"]),
+    ],
 )
-@patch("mx_bluesky.I24.serial.fixed_target.i24ssx_Chip_Manager_py3v1.setup_logging")
-def test_cs_maker_raises_error_for_wrong_direction_in_json(
-    fake_log: MagicMock,
-    fake_fid: MagicMock,
-    fake_dir: MagicMock,
-    fake_caget: MagicMock,
+def test_block_check_moves_to_block_starts_until_aborted(
+    abort_flags: List[str],
+    expected_moves: List[str],
     pmac: PMAC,
+    mock_pmac_str: MagicMock,
     RE,
+    chip_manager_mocks: SimpleNamespace,
+    monkeypatch,
 ):
-    fake_dir.return_value = (1, 1, 1)
-    fake_fid.return_value = (0, 0, 0)
-    with pytest.raises(ValueError):
-        RE(cs_maker(pmac))
+    fake_scrape = MagicMock(
+        return_value=[
+            ["01", "0.000", "0.000"],
+            ["02", "3.175", "0.000"],
+            ["03", "6.350", "0.000"],
+        ]
+    )
+    monkeypatch.setattr(f"{CHIP_MANAGER}.time", MagicMock())
+    monkeypatch.setattr(f"{CHIP_MANAGER}.scrape_pvar_file", fake_scrape)
+    chip_manager_mocks.caget.side_effect = ["0"] + abort_flags
+    RE(block_check(pmac))
 
+    chip_manager_mocks.caput.assert_called_once_with("ME14E-MO-IOC-01:GP9", 0)
+    fake_scrape.assert_called_once_with("oxford.pvar")
+    assert mock_pmac_str.call_args_list == [
+        call(move, wait=True, timeout=10.0) for move in expected_moves
+    ]
 
-@patch("mx_bluesky.I24.serial.fixed_target.i24ssx_Chip_Manager_py3v1.setup_logging")
-@patch("mx_bluesky.I24.serial.fixed_target.i24ssx_Chip_Manager_py3v1.caput")
-@patch("mx_bluesky.I24.serial.fixed_target.i24ssx_Chip_Manager_py3v1.caget")
-def test_pumpprobe_calc(
-    fake_caget: MagicMock, fake_caput: MagicMock, fake_log: MagicMock, RE
+
+@pytest.mark.parametrize(
+    "chip_type, expected_pvar_file",
+    [("0", "oxford.pvar"), ("1", "oxford.pvar"), ("3", "minichip-oxford.pvar")],
+)
+def test_block_check_uses_pvar_file_for_chip_type(
+    chip_type: str,
+    expected_pvar_file: str,
+    pmac: PMAC,
+    mock_pmac_str: MagicMock,
+    RE,
+    chip_manager_mocks: SimpleNamespace,
+    monkeypatch,
 ):
-    fake_caget.side_effect = [0.01, 0.005]
-    RE(pumpprobe_calc())
-    assert fake_caget.call_count == 2
-    assert fake_caput.call_count == 5
-    fake_caput.assert_has_calls(
-        [
-            call(ANY, 0.62),
-            call(ANY, 1.24),
-            call(ANY, 1.86),
-            call(ANY, 3.1),
-            call(ANY, 6.2),
-        ]
+    mock_scrape = MagicMock(wraps=scrape_pvar_file)
+    monkeypatch.setattr(f"{CHIP_MANAGER}.time", MagicMock())
+    monkeypatch.setattr(f"{CHIP_MANAGER}.scrape_pvar_file", mock_scrape)
+    chip_manager_mocks.caget.side_effect = lambda pv_name: (
+        chip_type if pv_name.endswith("GP1") else "0"
     )
+    RE(block_check(pmac))
+    mock_scrape.assert_called_once_with(expected_pvar_file)
+    assert mock_pmac_str.call_count > 0
+
+
+def test_block_check_raises_error_for_custom_chip(
+    pmac: PMAC, RE, chip_manager_mocks: SimpleNamespace
+):
+    chip_manager_mocks.caget.return_value = "2"
+    with pytest.raises(ValueError):
+        RE(block_check(pmac))
@@ -1,30 +1,80 @@
+import json
 from unittest.mock import patch
 
 import pytest
 
+from mx_bluesky.I24.serial.fixed_target.ft_utils import ChipType
 from mx_bluesky.I24.serial.fixed_target.i24ssx_Chip_StartUp_py3v1 import (
     check_files,
     fiducials,
     get_format,
+    get_shot_order,
+    get_xy,
+    get_xy_positions,
     pathli,
+    read_parameter_file,
+    write_file,
+    write_headers,
 )
+from mx_bluesky.I24.serial.parameters import FixedTargetParameters
+from mx_bluesky.I24.serial.parameters.constants import PARAM_FILE_NAME
 
 
 def test_fiducials():
     assert len(fiducials(0)) == 0
     assert len(fiducials(1)) == 0
+    assert len(fiducials(2)) == 0
 
 
 def test_get_format_for_oxford_chip():
     # oxford chip
     fmt = get_format(0)
-    assert fmt == [8, 8, 20, 20, 0.125, 0.800, 0.800]
+    assert fmt == (8, 8, 20, 20, 0.125, 0.800, 0.800)
 
 
 def test_get_format_for_oxford_minichip():
     # 1 block of oxford chip
     fmt = get_format(3)
-    assert fmt == [1, 1, 20, 20, 0.125, 0.0, 0.0]
+    assert fmt == (1, 1, 20, 20, 0.125, 0.0, 0.0)
+
+
+def test_read_parameter_file_only_reads_the_file_again_if_modified(tmp_path):
+    raw_params = {
+        "visit": "foo",
+        "directory": "bar",
+        "filename": "chip",
+        "exposure_time_s": 0.01,
+        "detector_distance_mm": 100,
+        "detector_name": "eiger",
+        "num_exposures": 1,
+        "chip_type": 0,
+        "map_type": 1,
+        "pump_repeat": 0,
+    }
+    params_file = tmp_path / PARAM_FILE_NAME
+    params_file.write_text(json.dumps(raw_params))
+    with patch.object(
+        FixedTargetParameters, "from_file", wraps=FixedTargetParameters.from_file
+    ) as patch_from_file:
+        params = read_parameter_file(tmp_path)
+        params.filename = "changed"
+        assert read_parameter_file(tmp_path).filename == "chip"
+        patch_from_file.assert_called_once()
+
+        params_file.write_text(json.dumps(raw_params | {"filename": "new_chip"}))
+        assert read_parameter_file(tmp_path).filename == "new_chip"
+        assert patch_from_file.call_count == 2
+
+
+@pytest.mark.parametrize(
+    "chip_type", [ChipType.Oxford, ChipType.OxfordInner, ChipType.Minichip]
+)
+def test_get_xy_positions_matches_get_xy(chip_type):
+    addr_list = get_shot_order(chip_type)
+    x_positions, y_positions = get_xy_positions(addr_list, chip_type)
+    assert list(zip(x_positions, y_positions)) == [
+        get_xy(addr, chip_type) for addr in addr_list
+    ]
 
 
 @patch("mx_bluesky.I24.serial.fixed_target.i24ssx_Chip_StartUp_py3v1.os")
@@ -48,7 +98,44 @@ def test_check_files(fake_read_params, mock_os, dummy_params_without_pp):
         ([1, 2, 3], "typewriter", True, [3, 2, 1] * 3),  # list[::-1] * len(list)
         ([4, 5], "snake", False, [4, 5, 5, 4]),  # Snakes the list
         ([4, 5], "expand", False, [4, 4, 5, 5]),  # Repeats each value
+        ([4, 5], "snake53", False, [4, 5, 5, 4] * 26 + [4, 5]),
+        ([4, 5], "expand25", True, [5] * 25 + [4] * 25),
+        ([4, 5], "expand28", False, [4] * 28 + [5] * 28),
+        ([4, 5], "zigzag", False, []),
+        ([], "snake", False, []),
     ],
 )
 def test_pathli(list_in, way, reverse, expected_res):
     assert pathli(list_in, way, reverse) == expected_res
+
+
+@patch(
+    "mx_bluesky.I24.serial.fixed_target.i24ssx_Chip_StartUp_py3v1.read_parameter_file"
+)
+def test_write_file(fake_read_params, dummy_params_without_pp, tmp_path):
+    fake_read_params.return_value = dummy_params_without_pp
+    (tmp_path / "chips/bar").mkdir(parents=True)
+    write_file(suffix=".addr", order="alphanumeric", save_path=tmp_path)
+
+    lines = (tmp_path / "chips/bar/chip.addr").read_text().splitlines()
+    assert len(lines) == 25600
+    assert lines[0] == "chip_A1_aa\t0.0\t0.0\t0.0\t-1"
+    assert lines[1] == "chip_A1_ab\t0.125\t0.0\t0.0\t-1"
+
+
+@patch(
+    "mx_bluesky.I24.serial.fixed_target.i24ssx_Chip_StartUp_py3v1.read_parameter_file"
+)
+def test_write_headers(fake_read_params, dummy_params_without_pp, tmp_path):
+    fake_read_params.return_value = dummy_params_without_pp
+    (tmp_path / "chips/bar").mkdir(parents=True)
+    write_headers("i24", [".addr", ".shot"], save_path=tmp_path)
+
+    header = (tmp_path / "chips/bar/chip.addr").read_text()
+    assert (tmp_path / "chips/bar/chip.shot").read_text() == header
+    lines = header.splitlines()
+    assert len(lines) == 16
+    assert lines[2] == "#&i24\tchip_name    = chip"
+    assert lines[4] == "#&i24\tsub_dir      = bar"
+    assert lines[13] == "#&i24\tdet_Type     = eiger"
+    assert lines[-1].startswith("#XtalAddr")
@@ -3,7 +3,6 @@ from unittest.mock import MagicMock, call, mock_open, patch
 import pytest
 from dodal.devices.i24.pmac import PMAC
 from dodal.devices.zebra import Zebra
-from ophyd_async.core import get_mock_put
 
 from mx_bluesky.I24.serial.fixed_target.ft_utils import ChipType, MappingType
 from mx_bluesky.I24.serial.fixed_target.i24ssx_Chip_Collect_py3v1 import (
@@ -31,8 +30,9 @@ def test_datasetsizei24_for_one_block_and_two_exposures(fake_caput):
     fake_caput.assert_called_once_with("ME14E-MO-IOC-01:GP10", 800)
 
 
-def test_get_chip_prog_values():
-    chip_dict = get_chip_prog_values(
+@pytest.fixture(scope="module")
+def chip_prog_values():
+    return get_chip_prog_values(
         0,
         0,
         0,
@@ -40,10 +40,13 @@ def test_get_chip_prog_values():
         0,
         n_exposures=2,
     )
-    assert isinstance(chip_dict, dict)
-    assert chip_dict["X_NUM_STEPS"][1] == 20 and chip_dict["X_NUM_BLOCKS"][1] == 8
-    assert chip_dict["PUMP_REPEAT"][1] == 0
-    assert chip_dict["N_EXPOSURES"][1] == 2
+
+
+def test_get_chip_prog_values(chip_prog_values):
+    assert chip_prog_values["X_NUM_STEPS"][1] == 20
+    assert chip_prog_values["X_NUM_BLOCKS"][1] == 8
+    assert chip_prog_values["PUMP_REPEAT"][1] == 0
+    assert chip_prog_values["N_EXPOSURES"][1] == 2
 
 
 @pytest.mark.parametrize(
@@ -93,6 +96,7 @@ def test_load_motion_program_data(
     checker: bool,
     expected_calls: list,
     pmac: PMAC,
+    mock_pmac_str: MagicMock,
     RE,
 ):
     test_dict = {"N_EXPOSURES": [0, 1]}
@@ -101,7 +105,6 @@ def test_load_motion_program_data(
     call_list = []
     for i in expected_calls:
         call_list.append(call(i, wait=True, timeout=10.0))
-    mock_pmac_str = get_mock_put(pmac.pmac_string)
     mock_pmac_str.assert_has_calls(call_list)
 
 
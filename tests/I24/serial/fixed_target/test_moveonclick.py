@@ -1,12 +1,14 @@
 from unittest.mock import ANY, MagicMock, call, patch
 
 import cv2 as cv
+import numpy as np
 import pytest
 from dodal.devices.i24.pmac import PMAC
-from dodal.devices.oav.oav_detector import OAV
-from ophyd_async.core import get_mock_put
 
 from mx_bluesky.I24.serial.fixed_target.i24ssx_moveonclick import (
+    FrameReader,
+    get_key_bindings,
+    make_overlay,
     onMouse,
     update_ui,
     zoomcalibrator,
@@ -33,19 +35,15 @@ from mx_bluesky.I24.serial.fixed_target.i24ssx_moveonclick import (
         ),
     ],
 )
-@patch("mx_bluesky.I24.serial.fixed_target.i24ssx_moveonclick._get_beam_centre")
 def test_onMouse_gets_beam_position_and_sends_correct_str(
-    fake_get_beam_pos: MagicMock,
     beam_position: tuple,
     expected_xmove: str,
     expected_ymove: str,
     pmac: PMAC,
+    mock_pmac_str: MagicMock,
     RE,
 ):
-    fake_get_beam_pos.side_effect = [beam_position]
-    fake_oav: OAV = MagicMock(spec=OAV)
-    RE(onMouse(cv.EVENT_LBUTTONUP, 0, 0, "", param=[pmac, fake_oav]))
-    mock_pmac_str = get_mock_put(pmac.pmac_string)
+    RE(onMouse(cv.EVENT_LBUTTONUP, 0, 0, "", param=[pmac, beam_position]))
     mock_pmac_str.assert_has_calls(
         [
             call(expected_xmove, wait=True, timeout=10),
@@ -55,13 +53,65 @@ def test_onMouse_gets_beam_position_and_sends_correct_str(
 
 
 @patch("mx_bluesky.I24.serial.fixed_target.i24ssx_moveonclick.cv")
-@patch("mx_bluesky.I24.serial.fixed_target.i24ssx_moveonclick._get_beam_centre")
-def test_update_ui_uses_correct_beam_centre_for_ellipse(fake_beam_pos, fake_cv):
-    mock_frame = MagicMock()
-    mock_oav = MagicMock()
-    fake_beam_pos.side_effect = [(15, 10)]
-    update_ui(mock_oav, mock_frame)
+def test_make_overlay_uses_correct_beam_centre_for_ellipse(fake_cv):
+    make_overlay((480, 640, 3), (15, 10))
     fake_cv.ellipse.assert_called_once()
     fake_cv.ellipse.assert_has_calls(
         [call(ANY, (15, 10), (12, 8), 0.0, 0.0, 360, (0, 255, 255), thickness=2)]
     )
+
+
+@patch("mx_bluesky.I24.serial.fixed_target.i24ssx_moveonclick.cv")
+def test_make_overlay_lists_block_check_and_refresh_keys(fake_cv):
+    make_overlay((480, 640, 3), (15, 10))
+    overlay_text = [text_call.args[1] for text_call in fake_cv.putText.call_args_list]
+    assert "K : block check" in overlay_text
+    assert "R : refresh beam centre" in overlay_text
+
+
+def test_make_overlay_draws_on_blank_image():
+    hud, mask = make_overlay((480, 640, 3), (320, 240))
+    assert hud.shape == (480, 640, 3)
+    assert mask.shape == (480, 640)
+    assert mask[240, 320 + 12]
+    assert not mask[400, 600]
+
+
+@patch("mx_bluesky.I24.serial.fixed_target.i24ssx_moveonclick.cv")
+def test_update_ui_copies_overlay_onto_frame(fake_cv):
+    frame = np.full((4, 4, 3), 7, dtype=np.uint8)
+    hud = np.zeros((4, 4, 3), dtype=np.uint8)
+    hud[1, 2] = (0, 255, 255)
+    update_ui(frame, (hud, hud.any(axis=-1)))
+    assert (frame[1, 2] == (0, 255, 255)).all()
+    assert (frame[0, 0] == 7).all()
+    fake_cv.imshow.assert_called_once_with("OAV1view", frame)
+
+
+@pytest.mark.parametrize(
+    "key, expected_pmac_string",
+    [("h", "#2J:-10"), ("n", "#2J:10"), ("m", "#1J:-10"), ("b", "#1J:10")],
+)
+def test_key_bindings_jog_keys_send_correct_str(
+    key: str, expected_pmac_string: str, pmac: PMAC, mock_pmac_str: MagicMock, RE
+):
+    RE(get_key_bindings(pmac)[ord(key)]())
+    mock_pmac_str.assert_called_once_with(expected_pmac_string, wait=True, timeout=10)
+
+
+@patch("mx_bluesky.I24.serial.fixed_target.i24ssx_moveonclick.manager")
+def test_key_bindings_block_check_on_k(fake_manager: MagicMock, pmac: PMAC):
+    key_bindings = get_key_bindings(pmac)
+    key_bindings[ord("k")]()
+    fake_manager.block_check.assert_called_once_with(pmac)
+
+
+def test_frame_reader_keeps_latest_frame_until_stream_ends():
+    fake_cap = MagicMock()
+    fake_cap.read.side_effect = [(True, "frame1"), (True, "frame2"), (False, None)]
+    reader = FrameReader(fake_cap)
+    reader.start()
+    reader._thread.join(timeout=1)
+    assert reader.running is False
+    assert reader.latest() == "frame2"
+    assert reader.latest() is None
@@ -0,0 +1,58 @@
+from subprocess import PIPE
+from unittest.mock import MagicMock, call, patch
+
+from mx_bluesky.I24.serial.setup_beamline.ca import caget_many, caput_many
+
+
+def _fake_process(stdout: bytes) -> MagicMock:
+    process = MagicMock()
+    process.communicate.return_value = (stdout, b"")
+    return process
+
+
+def _fake_cainfo(pv: str, data_type: str) -> MagicMock:
+    return _fake_process(
+        f"{pv}\n    State:            connected\n    Host:             host:5064\n"
+        f"    Access:           read, write\n    Native data type: {data_type}\n".encode()
+    )
+
+
+@patch("mx_bluesky.I24.serial.setup_beamline.ca.Popen")
+def test_caget_many_reads_all_pvs_in_one_call(fake_popen: MagicMock):
+    fake_popen.return_value = _fake_process(b"PV:A   1\nPV:B   foo\nPV:C   0.5\n")
+    res = caget_many(["PV:A", "PV:B", "PV:C"])
+    assert res == ["1", "foo", "0.5"]
+    fake_popen.assert_called_once()
+    assert fake_popen.call_args.args[0] == ["caget", "PV:A", "PV:B", "PV:C"]
+
+
+@patch("mx_bluesky.I24.serial.setup_beamline.ca.caget")
+@patch("mx_bluesky.I24.serial.setup_beamline.ca.Popen")
+def test_caget_many_falls_back_to_caget_for_missing_pv(
+    fake_popen: MagicMock, fake_caget: MagicMock
+):
+    fake_popen.return_value = _fake_process(b"PV:A   1\n")
+    fake_caget.return_value = "2"
+    res = caget_many(["PV:A", "PV:B"])
+    assert res == ["1", "2"]
+    fake_caget.assert_called_once_with("PV:B")
+
+
+@patch("mx_bluesky.I24.serial.setup_beamline.ca.Popen")
+def test_caput_many_uses_string_put_for_char_pvs(fake_popen: MagicMock):
+    fake_popen.side_effect = [
+        _fake_cainfo("PV:A", "DBF_DOUBLE"),
+        _fake_cainfo("PV:B", "DBF_CHAR"),
+        _fake_process(b""),
+        _fake_process(b""),
+    ]
+    caput_many(["PV:A", "PV:B"], [1, "foo"])
+    assert fake_popen.call_count == 4
+    fake_popen.assert_has_calls(
+        [
+            call(["cainfo", "PV:A"], stdout=PIPE, stderr=PIPE),
+            call(["cainfo", "PV:B"], stdout=PIPE, stderr=PIPE),
+            call(["caput", "PV:A", "1"], stdout=PIPE, stderr=PIPE),
+            call(["caput", "-S", "PV:B", "foo"], stdout=PIPE, stderr=PIPE),
+        ]
+    )
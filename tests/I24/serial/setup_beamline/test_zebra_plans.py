@@ -10,8 +10,10 @@ from dodal.devices.zebra import (
     TrigSource,
     Zebra,
 )
+from ophyd_async.core import set_mock_value
 
 from mx_bluesky.I24.serial.setup_beamline.setup_zebra_plans import (
+    ShutterMode,
     arm_zebra,
     disarm_zebra,
     get_zebra_settings_for_extruder,
@@ -38,10 +40,23 @@ async def test_arm_and_disarm_zebra(zebra: Zebra, RE):
     assert await zebra.pc.is_armed() is False
 
 
+def test_arm_and_disarm_zebra_do_nothing_if_already_in_state(zebra: Zebra, RE):
+    set_mock_value(zebra.pc.arm.armed, 1)
+    RE(arm_zebra(zebra))
+    zebra.pc.arm.arm_set.set.assert_not_called()  # type: ignore
+
+    set_mock_value(zebra.pc.arm.armed, 0)
+    RE(disarm_zebra(zebra))
+    zebra.pc.arm.disarm_set.set.assert_not_called()  # type: ignore
+
+
 async def test_set_shutter_mode(zebra: Zebra, RE):
-    RE(set_shutter_mode(zebra, "manual"))
+    RE(set_shutter_mode(zebra, ShutterMode.MANUAL))
     assert await zebra.inputs.soft_in_1.get_value() == "No"
 
+    RE(set_shutter_mode(zebra, ShutterMode.AUTO))
+    assert await zebra.inputs.soft_in_1.get_value() == "Yes"
+
 
 async def test_setup_pc_sources(zebra: Zebra, RE):
     RE(setup_pc_sources(zebra, TrigSource.TIME, TrigSource.POSITION))
@@ -128,6 +143,39 @@ async def test_setup_zebra_for_fastchip(zebra: Zebra, RE):
     assert await zebra.pc.pulse_step.get_value() == exposure_time + 0.0001
 
 
+@pytest.mark.parametrize(
+    "setup_plan, args",
+    [
+        (
+            setup_zebra_for_extruder_with_pump_probe_plan,
+            ("eiger", 0.01, 10, 0.005, 0.001),
+        ),
+        (setup_zebra_for_fastchip_plan, ("eiger", 400, 2, 0.001)),
+        (setup_zebra_for_quickshot_plan, (0.001, 10)),
+    ],
+)
+def test_zebra_setup_plans_only_wait_once_for_all_the_settings(
+    zebra: Zebra, setup_plan, args
+):
+    msgs = list(setup_plan(zebra, *args, group="setup", wait=True))
+    waits = [msg for msg in msgs if msg.command == "wait"]
+    assert len(waits) == 1
+    assert not [msg for msg in msgs if msg.command == "sleep"]
+    assert all(msg.kwargs["group"] == "setup" for msg in msgs if msg.command == "set")
+
+
+@pytest.mark.parametrize(
+    "setup_plan, args",
+    [
+        (setup_zebra_for_extruder_with_pump_probe_plan, (0.01, 10, 0.005, 0.001)),
+        (setup_zebra_for_fastchip_plan, (400, 2, 0.001)),
+    ],
+)
+def test_zebra_setup_plans_raise_for_unknown_detector(zebra: Zebra, setup_plan, args):
+    with pytest.raises(ValueError):
+        next(setup_plan(zebra, "jungfrau", *args))
+
+
 async def test_open_fast_shutter_at_each_position_plan(zebra: Zebra, RE):
     num_exposures = 2
     exposure_time = 0.001
@@ -175,6 +223,16 @@ async def test_zebra_return_to_normal(zebra: Zebra, RE):
     assert await zebra.output.pulse_1.input.get_value() == DISCONNECT
 
 
+def test_zebra_return_to_normal_waits_for_reset_then_once_for_the_rest(zebra: Zebra):
+    msgs = list(zebra_return_to_normal_plan(zebra, group="reset", wait=True))
+    commands = [msg.command for msg in msgs]
+    assert commands[:2] == ["set", "wait"]
+    assert msgs[0].obj is zebra.pc.reset
+    assert commands[2:].count("wait") == 1
+    assert commands[-1] == "wait"
+    assert all(msg.kwargs["group"] == "reset" for msg in msgs[2:-1])
+
+
 async def test_reset_zebra_plan(zebra: Zebra, RE):
     RE(reset_zebra_when_collection_done_plan(zebra))
 
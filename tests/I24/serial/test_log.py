@@ -1,4 +1,5 @@
 import logging
+from datetime import date
 from pathlib import Path
 from unittest.mock import patch
 
@@ -6,17 +7,32 @@ import pytest
 
 from mx_bluesky.I24.serial import log
 
-
-@pytest.fixture
-def dummy_logger():
-    logger = logging.getLogger("I24ssx")
-    yield logger
+# The I24ssx logger is shared, keep these on one worker when running with xdist
+pytestmark = pytest.mark.xdist_group("logging")
 
 
-def _destroy_handlers(logger):
-    for handler in logger.handlers:
-        handler.close()
-    logger.handlers.clear()
+@pytest.fixture(scope="session")
+def dummy_logger():
+    return logging.getLogger("I24ssx")
+
+
+@pytest.fixture(autouse=True)
+def _restore_handlers(dummy_logger, monkeypatch):
+    # Each test configures the logging from scratch, and any handlers it adds
+    # (including FileHandlers) are closed and removed even if the test fails.
+    monkeypatch.setattr(log, "_default_logging_set_up", False)
+    monkeypatch.setattr(log, "_file_handler_dates", {})
+    saved_handlers = {
+        lg: list(lg.handlers) for lg in (dummy_logger, dummy_logger.parent)
+    }
+    try:
+        yield
+    finally:
+        for lg, handlers in saved_handlers.items():
+            for handler in lg.handlers:
+                if handler not in handlers:
+                    handler.close()
+            lg.handlers[:] = handlers
 
 
 @patch("mx_bluesky.I24.serial.log.environ")
@@ -25,6 +41,7 @@ def test_logging_file_path(mock_dir, mock_environ):
     mock_environ.get.return_value = None
     log_path = log._get_logging_file_path()
     assert mock_dir.call_count == 1
+    assert log_path is log._LOG_DIR
     assert log_path.as_posix() == "tmp/logs"
 
 
@@ -39,7 +56,9 @@ def test_logging_file_path_on_beamline(mock_dir, mock_environ, mock_visit):
     assert log_path.as_posix() == "/path/to/i24/data/tmp/serial/logs"
 
 
-def test_basic_logging_config(dummy_logger):
+@patch("mx_bluesky.I24.serial.log.default_logging_setup")
+def test_basic_logging_config(mock_default, dummy_logger):
+    log.config()
     assert dummy_logger.hasHandlers() is True
     assert len(dummy_logger.handlers) == 1
     assert dummy_logger.handlers[0].level == logging.DEBUG
@@ -63,6 +82,26 @@ def test_logging_config_with_filehandler(mock_default, mock_dir, dummy_logger):
     # assert len(dummy_logger.parent.handlers) == 3
     assert mock_dir.call_count == 1
     assert dummy_logger.handlers[1].level == logging.DEBUG
-    # Clear FileHandler to avoid other tests failing if it is kept open
-    dummy_logger.removeHandler(dummy_logger.handlers[1])
-    _destroy_handlers(dummy_logger.parent)
+
+
+@patch("mx_bluesky.I24.serial.log.Path.mkdir")
+@patch("mx_bluesky.I24.serial.log.default_logging_setup")
+def test_logging_config_does_not_duplicate_filehandler(
+    mock_default, mock_dir, dummy_logger
+):
+    log.config("dummy.log", delayed=True, dev_mode=True)
+    log.config("dummy.log", delayed=True, dev_mode=True)
+    assert len(dummy_logger.handlers) == 2
+
+
+@patch("mx_bluesky.I24.serial.log.date")
+@patch("mx_bluesky.I24.serial.log.Path.mkdir")
+@patch("mx_bluesky.I24.serial.log.default_logging_setup")
+def test_logging_config_drops_previous_day_filehandler(
+    mock_default, mock_dir, mock_date, dummy_logger
+):
+    mock_date.today.side_effect = [date(2024, 5, 1), date(2024, 5, 2)]
+    log.config("dummy_01may24.log", delayed=True, dev_mode=True)
+    log.config("dummy_02may24.log", delayed=True, dev_mode=True)
+    assert len(dummy_logger.handlers) == 2
+    assert dummy_logger.handlers[1].baseFilename.endswith("dummy_02may24.log")
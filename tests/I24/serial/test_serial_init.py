@@ -0,0 +1,25 @@
+import subprocess
+import sys
+
+import mx_bluesky.I24.serial as serial
+
+
+def test_lazy_exports_match_all():
+    assert set(serial.__all__) == set(serial._LAZY)
+
+
+def test_dir_lists_each_export_once():
+    names = dir(serial)
+    assert len(names) == len(set(names))
+    assert set(serial.__all__) <= set(names)
+
+
+def test_importing_package_does_not_import_plan_modules():
+    code = (
+        "import sys; import mx_bluesky.I24.serial; "
+        "print(any('i24ssx_Chip_Manager_py3v1' in m for m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    assert result.stdout.strip() == "False"